@@ -0,0 +1,5 @@
+"""
+Synthetic data generation and timing of the system's hot paths.
+
+    python -m benchmarks.run --students 40000 --attendance 2000000 --output results.json
+"""
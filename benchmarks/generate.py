@@ -0,0 +1,120 @@
+import random
+from datetime import date, datetime, timedelta
+
+from utils.passwords import hash_password
+
+# Default size of every generated table
+DEFAULT_SIZES = {
+    "courses": 200,
+    "modules": 2000,
+    "students": 40000,
+    "modules_per_student": 4,
+    "attendance": 1000000,
+    "grades": 100000,
+    "pending_fees": 20000,
+    "paid_fees": 20000,
+    "registrations": 3000,
+    "decided_registrations": 3000,
+    "users": 500,
+}
+
+MONTHS = ["January", "February", "March", "April", "May", "June", "July", "August",
+          "September", "October", "November", "December"]
+WORDS = ["Computer", "Science", "Data", "Software", "Engineering", "Business", "Accounting", "Finance",
+         "Digital", "Media", "Cyber", "Security", "Artificial", "Intelligence", "Networks", "Systems",
+         "Mathematics", "Physics", "Design", "Marketing", "Management", "Analytics", "Cloud", "Robotics"]
+ROLES = ["Admin", "Lecturer", "Accountant", "Registrar", "Student"]
+USER_PASSWORD = "password123"
+
+
+def write_lines(file_path, lines):
+    with open(file_path, "w", encoding="utf-8") as file:
+        for line in lines:
+            file.write(line + "\n")
+
+
+def course_name(rng):
+    return " ".join(rng.sample(WORDS, rng.randint(2, 4)))
+
+
+def generate_dataset(sizes=None, seed=0):
+    """
+    Writes a consistent synthetic data set in the formats main.py expects to the current
+    directory, and returns the identifiers the benchmarks need to build their inputs.
+    """
+    sizes = {**DEFAULT_SIZES, **(sizes or {})}
+    rng = random.Random(seed)
+
+    courses = [(f"C{index:05d}-UNI", course_name(rng)) for index in range(sizes["courses"])]
+    write_lines("courses.txt", (f"{code},{name},Synthetic course {index}"
+                                for index, (code, name) in enumerate(courses)))
+
+    modules = [f"MO{index:06d}-SM-LC" for index in range(sizes["modules"])]
+    write_lines("modules_list.txt", (f"{module_id},Module {index},Lecturer {index % 100},L{index % 100:03d},"
+                                     f"{rng.choice([10, 15, 20])},{rng.randint(20, 40)}"
+                                     for index, module_id in enumerate(modules)))
+
+    students = [(f"Student {index}", f"{100000 + index}") for index in range(sizes["students"])]
+    enrollments = []
+    student_lines = []
+    for name, student_id in students:
+        taken = rng.sample(modules, min(sizes["modules_per_student"], len(modules)))
+        enrollments.extend((module_id, student_id, name) for module_id in taken)
+        student_lines.append(f"{name},{student_id},{rng.choice(courses)[0]},{','.join(taken)},"
+                             f"{rng.choice(MONTHS)},{rng.choice(MONTHS)},01{rng.randint(10000000, 99999999)},"
+                             f"s{student_id}@example.edu,{rng.randint(1, 999)} Campus Road,{rng.randint(18, 40)}")
+    write_lines("student_records.txt", student_lines)
+    write_lines("module_student_records.txt", (f"{module_id},{student_id},{name}"
+                                               for module_id, student_id, name in enrollments))
+
+    start = date(2024, 1, 1)
+    with open("attendance_records.txt", "w", encoding="utf-8") as file:
+        for _ in range(sizes["attendance"]):
+            module_id, student_id, _ = rng.choice(enrollments)
+            day = start + timedelta(days=rng.randint(0, 364))
+            status = "present" if rng.random() < 0.8 else "absent"
+            file.write(f"{module_id},{student_id},{day},{status}\n")
+
+    grade_lines = []
+    for _ in range(sizes["grades"]):
+        module_id, student_id, _ = rng.choice(enrollments)
+        grade_lines.append(f"{student_id},{module_id},{rng.randint(0, 100)}.0,B+")
+    write_lines("grades_records.txt", grade_lines)
+
+    moment = datetime(2024, 1, 1, 9, 0, 0)
+    pending = rng.sample(students, min(sizes["pending_fees"], len(students)))
+    write_lines("tuition_fees_pending.txt", (f"{student_id},{rng.randint(1000, 9000)}.0,"
+                                             f"{moment + timedelta(minutes=index)}"
+                                             for index, (_, student_id) in enumerate(pending)))
+    paid = [rng.choice(students)[1] for _ in range(sizes["paid_fees"])]
+    write_lines("tuition_fees_paid.txt", (f"{student_id},5000.0,{moment + timedelta(minutes=index)},paid"
+                                          for index, student_id in enumerate(paid)))
+    write_lines("fee_receipts.txt", (f"{student_id},5000.0,{moment + timedelta(minutes=index)}"
+                                     for index, student_id in enumerate(paid)))
+
+    def registration(index):
+        return (f"Applicant {index},applicant{index}@example.com,P{index:08d},"
+                f"{rng.choice(courses)[1]}")
+
+    decided = sizes["decided_registrations"]
+    write_lines("accepted_registrations.txt", (registration(index) for index in range(0, decided, 2)))
+    write_lines("declined_registrations.txt", (registration(index) for index in range(1, decided, 2)))
+    write_lines("registrations.txt", (registration(index)
+                                      for index in range(decided, decided + sizes["registrations"])))
+
+    users = [f"user{index}" for index in range(sizes["users"])]
+    # One hash is shared by every synthetic user, so generation does not pay the hashing cost per user
+    password_hash = hash_password(USER_PASSWORD)
+    write_lines("user_data.txt", (f"{username},{password_hash},{ROLES[index % len(ROLES)]}"
+                                  for index, username in enumerate(users)))
+
+    return {
+        "modules": modules,
+        "students": [student_id for _, student_id in students],
+        "course_names": [name for _, name in courses],
+        "pending_students": [student_id for _, student_id in pending],
+        "passports": [f"P{index:08d}" for index in range(decided + sizes["registrations"])],
+        "users": users,
+        "user_password": USER_PASSWORD,
+        "enrollments": [(module_id, student_id) for module_id, student_id, _ in enrollments],
+    }
@@ -0,0 +1,147 @@
+import argparse
+import builtins
+import contextlib
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.generate import DEFAULT_SIZES, generate_dataset
+from utils.filehandling import close_logs
+from utils.passwords import forget_credentials
+
+
+def scripted_input(answers):
+    """Returns an input() replacement that plays back the answers, then presses Enter."""
+    answers = iter(answers)
+    return lambda prompt="": next(answers, "")
+
+
+def time_call(function, answers):
+    """Runs one call with scripted input and discarded output, returning the elapsed seconds."""
+    original_input = builtins.input
+    builtins.input = scripted_input(answers)
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            function()
+            return time.perf_counter() - start
+    finally:
+        builtins.input = original_input
+
+
+def build_cases(dataset, rng):
+    """Returns (name, function, answers factory) for every benchmarked hot path."""
+    from utils.accountant import process_pending_to_paid
+    from utils.admin import student_statistics
+    from utils.lecturer import calculate_attendance, view_grades
+    from utils.login import login
+    from utils.registrar import check_student_acceptance
+    from utils.utility import search_course
+
+    pending = list(dataset["pending_students"])
+    rng.shuffle(pending)
+    pending_iterator = iter(pending)
+    paying = {}
+
+    def pay_next():
+        paying["student_id"] = next(pending_iterator)
+
+    def cold_login():
+        # Without the verified-credential cache every run derives the key again
+        username = rng.choice(dataset["users"])
+        forget_credentials(username)
+        return [username, dataset["user_password"]]
+
+    def attendance():
+        module_id, student_id = rng.choice(dataset["enrollments"])
+        calculate_attendance(student_id, module_id)
+
+    return [
+        ("calculate_attendance", attendance, lambda: []),
+        ("view_grades", view_grades, lambda: [rng.choice(dataset["modules"])]),
+        ("search_course", search_course, lambda: [rng.choice(dataset["course_names"]).split()[0]]),
+        ("search_course_typo", search_course, lambda: [rng.choice(dataset["course_names"])[:-1] + "x"]),
+        ("student_statistics", student_statistics, lambda: []),
+        ("process_pending_to_paid",
+         lambda: process_pending_to_paid(paying["student_id"], "tuition_fees_pending.txt",
+                                         "tuition_fees_paid.txt", "accountant_log.txt"),
+         lambda: (pay_next(), ["5000"])[1]),
+        ("check_student_acceptance", check_student_acceptance, lambda: [rng.choice(dataset["passports"])]),
+        ("login", login, cold_login),
+        ("login_cached", login, lambda: [dataset["users"][0], dataset["user_password"]]),
+    ]
+
+
+def run_benchmarks(dataset, repeat, seed):
+    rng = random.Random(seed)
+    results = {}
+    for name, function, answers in build_cases(dataset, rng):
+        timings = [time_call(function, answers()) for _ in range(repeat)]
+        results[name] = {
+            "runs": repeat,
+            "first_seconds": timings[0],
+            "min_seconds": min(timings),
+            "median_seconds": statistics.median(timings),
+            "mean_seconds": statistics.fmean(timings),
+        }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run",
+                                     description="Generate synthetic data and time the hot paths.")
+    for table, size in DEFAULT_SIZES.items():
+        parser.add_argument(f"--{table.replace('_', '-')}", type=int, default=size, dest=table,
+                            help=f"Size of the {table.replace('_', ' ')} table (default {size}).")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per hot path (default 5).")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for data and inputs (default 0).")
+    parser.add_argument("--data-dir", help="Directory for the generated files (default: a temporary one).")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout.")
+    args = parser.parse_args(argv)
+
+    sizes = {table: getattr(args, table) for table in DEFAULT_SIZES}
+    data_dir = os.path.abspath(args.data_dir or tempfile.mkdtemp(prefix="ums-bench-"))
+    os.makedirs(data_dir, exist_ok=True)
+    output = os.path.abspath(args.output) if args.output else None
+
+    working_dir = os.getcwd()
+    os.chdir(data_dir)
+    try:
+        start = time.perf_counter()
+        dataset = generate_dataset(sizes, args.seed)
+        generation_seconds = time.perf_counter() - start
+        results = run_benchmarks(dataset, args.repeat, args.seed)
+    finally:
+        # Buffered log records belong to the data directory, not the caller's one
+        close_logs()
+        os.chdir(working_dir)
+        if not args.data_dir:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sizes": sizes,
+        "repeat": args.repeat,
+        "seed": args.seed,
+        "data_dir": data_dir if args.data_dir else None,
+        "generation_seconds": generation_seconds,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
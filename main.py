@@ -1,3 +1,6 @@
+import sys
+
+
 def ensure_text_files_exist(file_names):
     for file_name in file_names:
         try:
@@ -11,20 +14,12 @@ def ensure_text_files_exist(file_names):
             print(f"Created missing file: {file_name}")
 
 if __name__ == "__main__":
-    required_files = [
-        "tuition_fees_pending.txt",
-        "tuition_fees_paid.txt",
-        "fee_receipts.txt",
-        "modules_list.txt",
-        "courses.txt",
-        "student_records.txt",
-        "module_student_records.txt",
-        "attendance_records.txt",
-        "grades_records.txt",
-        "registrations.txt",
-        "accepted_registrations.txt",
-        "declined_registrations.txt"
-    ]
+    from utils.schema import SCHEMAS
+    required_files = list(SCHEMAS)
     ensure_text_files_exist(required_files)
+    if len(sys.argv) > 1:
+        # Batch commands run without any prompts, see `python main.py --help`
+        from utils.cli import run_cli
+        sys.exit(run_cli(sys.argv[1:]))
     from utils.menu import guest_menu
     guest_menu()
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from utils.filehandling import close_logs, log_message
+from utils.login import start_session, end_session, has_role
+from utils.menu import handle_menu, admin_menu, display_menu
+
+
+class LogoutTest(unittest.TestCase):
+    def setUp(self):
+        # Log records are written to the working directory
+        self.working_dir = os.getcwd()
+        self.data_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.data_dir.name)
+
+    def tearDown(self):
+        end_session()
+        close_logs()
+        os.chdir(self.working_dir)
+        self.data_dir.cleanup()
+
+    def test_logout_ends_session(self):
+        start_session("admin", "Admin")
+        with mock.patch("builtins.input", return_value="0"), mock.patch("builtins.print"):
+            handle_menu(["Add Course"], [lambda: None])
+        self.assertFalse(has_role("Admin"))
+
+    def test_role_menu_logout_requires_new_login(self):
+        start_session("admin", "Admin")
+        with mock.patch("builtins.input", return_value="0"), mock.patch("builtins.print"):
+            admin_menu()
+        self.assertFalse(has_role("Admin"))
+
+
+class LogFlushTest(unittest.TestCase):
+    def setUp(self):
+        self.working_dir = os.getcwd()
+        self.data_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.data_dir.name)
+
+    def tearDown(self):
+        close_logs()
+        os.chdir(self.working_dir)
+        self.data_dir.cleanup()
+
+    def test_menu_writes_buffered_records(self):
+        log_message("Course added.", "admin_log.txt")
+        with mock.patch("builtins.print"):
+            display_menu(["Add Course"])
+        with open("admin_log.txt", encoding="utf-8") as log:
+            self.assertIn("Course added.", log.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,9 @@
+import math
 from datetime import datetime
 
-from utils.filehandling import append_to_file, read_file, overwrite_file, log_message
+from utils.filehandling import append_to_file, log_message, journal_delete, iter_records, iter_rows
+from utils.aggregate import column_total
+from utils.stats import load_stats, record_change
 from utils.utility import get_valid_student_id
 
 
@@ -13,22 +16,9 @@ def calculate_total_from_records(file_path, record_type, log_file_path):
     # Initializing the total amount at start
     total_amount = 0.0
     try:
-        with open(file_path, "r") as file:
-            for line in file:
-                # Remove leading/trailing whitespace
-                line = line.strip()
-                if line:
-                    split_record = line.split(",", maxsplit=3 if record_type == "paid" else 2)
-
-                    # Ensure the record has at least two fields
-                    if len(split_record) >= 2:
-                        try:
-                            # Add the amount to the total
-                            total_amount += float(split_record[1])
-                        except ValueError:
-                            log_message(f"Invalid {record_type} amount skipped: {line}", log_file_path)
-                    else:
-                        log_message(f"Invalid {record_type} record skipped: {line}", log_file_path)
+        # Only the amount is converted, so a record with a malformed date still counts
+        total_amount = column_total(file_path, "amount", invalid=lambda line: log_message(
+            f"Invalid {record_type} amount skipped: {line}", log_file_path))
     except FileNotFoundError:
         log_message(f"File not found: {file_path}. Unable to process {record_type} records.", log_file_path)
     return total_amount
@@ -49,11 +39,17 @@ def view_financial_summary(pending_file_path="tuition_fees_pending.txt",
     Displays a financial summary of total fees collected and outstanding.
     """
     try:
-        # Calculates the total fees collected from the paid file
-        total_paid = calculate_total_from_records(paid_file_path, "paid", log_file_path)
+        # Read the totals from the dashboard counters, unless the summary is asked for other files
+        stats = load_stats()
+        if paid_file_path == "tuition_fees_paid.txt":
+            total_paid = stats["paid_fees"]
+        else:
+            total_paid = calculate_total_from_records(paid_file_path, "paid", log_file_path)
 
-        # Calculates total outstanding fees from the pending file
-        total_outstanding = calculate_total_from_records(pending_file_path, "pending", log_file_path)
+        if pending_file_path == "tuition_fees_pending.txt":
+            total_outstanding = stats["pending_fees"]
+        else:
+            total_outstanding = calculate_total_from_records(pending_file_path, "pending", log_file_path)
 
         # Displays the financial summary to the user
         display_financial_summary_details(total_paid, total_outstanding)
@@ -64,12 +60,21 @@ def view_financial_summary(pending_file_path="tuition_fees_pending.txt",
         log_message(f"Unexpected error in view_financial_summary: {e}", log_file_path)
 
 
+def save_receipt(student_id, amount_paid, date_of_payment, receipt_file="fee_receipts.txt",
+                 log_file="accountant_log.txt"):
+    """
+    Saves the receipt for the given student ID to the receipts file without any prompts.
+    """
+    receipt_entry = f"{student_id},{amount_paid},{date_of_payment}"
+    append_to_file(receipt_file, receipt_entry)
+    log_message(f"Receipt generated for student {student_id}: {receipt_entry}", log_file, flush=True)
+
+
 def generate_receipt(student_id, amount_paid, date_of_payment, receipt_file="fee_receipts.txt",
                      log_file="accountant_log.txt"):
     """
     Generates the receipt for the given student ID using the given amount and date of payment.
     """
-    receipt_entry = f"{student_id},{amount_paid},{date_of_payment}"
     try:
         # Print the receipt details in a clear format
         print("\nReceipt Details:")
@@ -77,15 +82,13 @@ def generate_receipt(student_id, amount_paid, date_of_payment, receipt_file="fee
         print(f"Amount Paid: ${amount_paid:.2f}")
         print(f"Date of Payment: {date_of_payment}")
 
-        with open(receipt_file, 'a', encoding='utf-8') as file:
-            file.write(receipt_entry.strip() + "\n")
+        save_receipt(student_id, amount_paid, date_of_payment, receipt_file, log_file)
         print(f"Receipt generated and saved for student {student_id}.")
         input("Press Enter to continue...")
-        log_message(f"Receipt generated for student {student_id}: {receipt_entry.strip()}", log_file)
     except Exception as e:
         print(f"Failed to generate receipt: {e}")
         input("Press Enter to continue...")
-        log_message(f"Receipt generation failed for student {student_id}: {e}", log_file)
+        log_message(f"Receipt generation failed for student {student_id}: {e}", log_file, flush=True)
 
 
 def view_receipt(receipt_file="fee_receipts.txt"):
@@ -94,21 +97,16 @@ def view_receipt(receipt_file="fee_receipts.txt"):
     """
     try:
         student_id = input("Enter Student ID to view receipt: ").strip()
-        with open(receipt_file, 'r', encoding='utf-8') as file:
-            receipts = file.readlines()
+        # Stop reading at the first receipt of the student
+        receipt = next(iter_records(receipt_file, column=0, value=student_id), None)
 
         print("\nReceipt Details:")
-        found = False
-        for receipt in receipts:
-            stored_id, amount_paid, date_of_payment = receipt.strip().split(',')
-            if stored_id == student_id:
-                print(f"Student ID: {stored_id}")
-                print(f"Amount Paid: MYR {float(amount_paid):.2f}")
-                print(f"Date of Payment: {date_of_payment}")
-                found = True
-                break
-
-        if not found:
+        if receipt:
+            stored_id, amount_paid, date_of_payment = receipt
+            print(f"Student ID: {stored_id}")
+            print(f"Amount Paid: MYR {float(amount_paid):.2f}")
+            print(f"Date of Payment: {date_of_payment}")
+        else:
             print(f"No receipt found for student ID {student_id}.")
         input("Press Enter to continue...")
     except FileNotFoundError:
@@ -124,7 +122,9 @@ def get_valid_amount_paid():
     while True:
         try:
             amount_paid = float(input("Enter the amount: "))
-            if amount_paid <= 0:
+            if not math.isfinite(amount_paid):
+                print("Invalid input. Please enter a numeric value.")
+            elif amount_paid <= 0:
                 print("Amount must be greater than zero. Please try again.")
             else:
                 return amount_paid
@@ -141,73 +141,66 @@ def prompt_user_for_action():
     return choice
 
 
-def remove_empty_lines(file_path, log_file_path):
-    """Removes empty lines from a given file."""
-    try:
-        with open(file_path, "r") as file:
-            lines = file.readlines()  # Read all lines
-
-        with open(file_path, "w") as file:
-            for line in lines:
-                if line.strip():  # Keep lines that are not empty
-                    file.write(line)
-
-        log_message(f"Empty lines removed from '{file_path}'.", log_file_path)
-    except FileNotFoundError:
-        log_message(f"File not found: {file_path}. Could not remove empty lines.", log_file_path)
-    except Exception as e:
-        log_message(f"Unexpected error while removing empty lines from {file_path}: {e}", log_file_path)
+def record_pending_fees(student_id, pending_amount, pending_file="tuition_fees_pending.txt",
+                        log_file="accountant_log.txt"):
+    """Appends a pending fees record for the student without any prompts."""
+    date_of_update = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    append_to_file(pending_file, f"{student_id},{pending_amount},{date_of_update}")
+    record_change(pending_file, rows=1, amount=float(pending_amount))
+    log_message(f"Student {student_id} added to pending record.", log_file, flush=True)
+    return date_of_update
 
 
 def add_student_to_pending_record(student_id, pending_file, log_file):
-    """Add a student's pending fees record and ensure no empty lines in the pending file."""
+    """Add a student's pending fees record to the pending file."""
     pending_amount = get_valid_amount_paid()
-    date_of_update = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    pending_record_entry = f"{student_id},{pending_amount},{date_of_update}\n"
 
     # Append the record to the file
-    append_to_file(pending_file, pending_record_entry)
-
-    # Remove empty lines from the file to maintain consistency
-    remove_empty_lines(pending_file, log_file)
+    record_pending_fees(student_id, pending_amount, pending_file, log_file)
 
-    # Notify and log the operation
+    # Notify the user
     print(f"Student {student_id} added to pending tuition fees record.")
-    log_message(f"Student {student_id} added to pending record.", log_file)
 
 
-def process_pending_to_paid(student_id, pending_file, paid_file, log_file):
-    updated_amount = get_valid_amount_paid()
+def record_payment(student_id, amount_paid, pending_file="tuition_fees_pending.txt",
+                   paid_file="tuition_fees_paid.txt", log_file="accountant_log.txt"):
+    """
+    Moves the student from the pending records to the paid records without any prompts.
+    Returns the date of the payment and whether a pending record was found.
+    """
     date_of_update = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    paid_record_entry = f"{student_id},{updated_amount},{date_of_update},paid\n"
 
-    # Read the pending records and find the student's record
-    pending_records = read_file(pending_file)  # Assuming this returns a list of lines
-    updated_pending_records = []
-    record_found = False
+    # Read every pending record of the student, which are all settled by the payment
+    # and all removed by the key-based delete below
+    pending_records = list(iter_records(pending_file, column=0, value=student_id))
+    record_found = bool(pending_records)
+    if record_found:
+        pending_total = 0.0
+        for fields in pending_records:
+            try:
+                pending_total += float(fields[1])
+            except (IndexError, ValueError):
+                log_message(f"Invalid pending amount removed: {','.join(fields)}", log_file)
+        # Record the removal of the transferred records in the pending file's journal
+        journal_delete(pending_file, student_id)
+        record_change(pending_file, rows=-len(pending_records), amount=-pending_total)
 
-    for record in pending_records:
-        record = record.strip()
-        if record.startswith(student_id + ","):
-            record_found = True
-        else:
-            updated_pending_records.append(record)
+    # Add the record to the paid file
+    append_to_file(paid_file, f"{student_id},{amount_paid},{date_of_update},paid")
+    record_change(paid_file, rows=1, amount=float(amount_paid))
+    log_message(f"Tuition fees paid record updated for student {student_id}.", log_file, flush=True)
+    return date_of_update, record_found
+
+
+def process_pending_to_paid(student_id, pending_file, paid_file, log_file):
+    updated_amount = get_valid_amount_paid()
+    date_of_update, record_found = record_payment(student_id, updated_amount, pending_file, paid_file, log_file)
 
     if not record_found:
         print(f"No pending record found for student {student_id}.")
     else:
-        # Update the pending file by removing the transferred record
-        overwrite_file(pending_file, "\n".join(updated_pending_records) + "\n")
         print(f"Removed student {student_id} from pending records.")
-
-    # Add the record to the paid file
-    append_to_file(paid_file, paid_record_entry)
-
-    # Remove any empty lines after appending the record
-    remove_empty_lines(paid_file, log_file)
-
     print(f"Tuition fees recorded as paid for student {student_id}.")
-    log_message(f"Tuition fees paid record updated for student {student_id}.", log_file)
 
     # Generate a receipt for the transaction
     generate_receipt(student_id, updated_amount, date_of_update, log_file=log_file)
@@ -266,19 +259,13 @@ def view_outstanding_fees(pending_file_path="tuition_fees_pending.txt", log_file
             print("Invalid choice. Defaulting to no sorting.")
             sort_by = None
         # Read records from file and process line by line
-        fee_records = []
-        with open(pending_file_path, "r") as file:
-            for line in file:
-                line = line.strip()
-                if line:
-                    split_record = line.split(",", maxsplit=2)
-                    if len(split_record) == 3:
-                        student_id, amount, updated_at = split_record
-                        fee_records.append((student_id, float(amount), updated_at))
-                    else:
-                        log_message(f"Invalid record skipped: {line}", log_file_path)
-                        print(f"Skipping invalid record: {line}")
-                        input("Press Enter to continue...")
+        def skip_invalid_record(line):
+            log_message(f"Invalid record skipped: {line}", log_file_path)
+            print(f"Skipping invalid record: {line}")
+            input("Press Enter to continue...")
+
+        # Rows come back as (student ID, float amount, datetime of the last update)
+        fee_records = list(iter_rows(pending_file_path, invalid=skip_invalid_record))
         # Check if no records are found
         if not fee_records:
             print("No outstanding fees found.")
@@ -289,7 +276,7 @@ def view_outstanding_fees(pending_file_path="tuition_fees_pending.txt", log_file
         if sort_by == "amount":
             fee_records.sort(key=lambda record: record[1])  # Sort by amount
         elif sort_by == "date":
-            fee_records.sort(key=lambda record: datetime.strptime(record[2], "%Y-%m-%d %H:%M:%S"))  # Sort by date
+            fee_records.sort(key=lambda record: record[2])  # Sort by date
         # Display header
         print("\nOutstanding Fees:\n" + "-" * 50)
         # Display and calculate totals
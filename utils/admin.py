@@ -1,4 +1,22 @@
-from utils.filehandling import read_file, overwrite_file, append_to_file, log_message
+from utils.filehandling import (read_file, append_to_file, log_message, lookup_record, get_index,
+                                journal_upsert, record_key, write_journal, load_table, compact_file)
+from utils.ids import allocate_id, allocate_ids, observe_ids
+from utils.aggregate import count_rows, breakdowns
+from utils.stats import load_stats, record_change, refresh_stats
+from utils.lecturer import ATTENDANCE_SUMMARY_FILE
+from utils.schema import column_index
+
+# Files that refer to students, with the column holding the student ID. A removed
+# student is deleted from all of them before the student record itself goes.
+STUDENT_REFERENCES = {
+    "module_student_records.txt": 1,
+    "attendance_records.txt": 1,
+    ATTENDANCE_SUMMARY_FILE: 1,
+    "grades_records.txt": 0,
+    "tuition_fees_pending.txt": 0,
+    "tuition_fees_paid.txt": 0,
+    "fee_receipts.txt": 0,
+}
 
 
 def get_module_initials(module_name):
@@ -10,17 +28,8 @@ def get_lecturer_initials(lecturer_name):
 
 
 def generate_unique_id(base_value):
-    seed = (base_value * 1234) % 10000
     # Ensure the ID is at least 4 digits long
-    return str(seed).zfill(4)
-
-
-def get_current_record_count(file_path):
-    try:
-        with open(file_path, "r", encoding="utf-8") as file:
-            return len(file.readlines())
-    except FileNotFoundError:
-        return 0
+    return str(base_value).zfill(4)
 
 
 def generate_module_id(module_name, lecturer_name, base_value):
@@ -28,7 +37,8 @@ def generate_module_id(module_name, lecturer_name, base_value):
     Creates a unique module identifier, based on the module name and lecturer name,
     and a base value. The module identifier consists of a prefix resulting from the
     module name, base value from which a unique ID will be created and initials for both
-    the module and the lecturer.
+    the module and the lecturer. The base value is a number from the module ID sequence,
+    so no two modules share it.
     """
     prefix = module_name[:2].upper()
     unique_id = generate_unique_id(base_value)
@@ -71,42 +81,52 @@ def create_module(file_path="modules_list.txt"):
         if not number_of_classes:
             print("Number of classes to be attended cannot be empty.")
             return
-        record_count = get_current_record_count(file_path)
-        module_id = generate_module_id(module_name, lecturer_name, record_count)
-        module_data = f"{module_id},{module_name},{lecturer_name},{lecturer_id},{credits},{number_of_classes}\n"
-        with open(file_path, "a", encoding="utf-8") as file:
-            file.write(module_data)
+        module_id = generate_module_id(module_name, lecturer_name, allocate_id("module", file_path))
+        append_to_file(file_path,
+                       f"{module_id},{module_name},{lecturer_name},{lecturer_id},{credits},{number_of_classes}")
+        record_change(file_path, rows=1)
         print(f"Module '{module_name}' created successfully with ID: {module_id}")
 
     except Exception as e:
         print(f"An error occurred while creating the module: {e}")
 
 
-def get_course_details():
+def get_course_details(file_path="courses.txt"):
     """
     Prompts the user to input details for a new course and generates a unique course ID.
     The course code is generated using the initials of the course name.
-    A unique ID is created by hashing the course name and appending a random value.
+    A unique ID is created by appending the next number of the course ID sequence.
     """
     name = input("Enter the course name: ").strip()
     details = input("Enter course details: ").strip()
     uni_initials = input("Enter university initials: ").strip()
 
-    # Generate the course code from the initials of the course name
-    course_code = "".join(word[0].upper() for word in name.split())
+    # Check the input before a number of the sequence is taken for it
+    error = validate_course_fields(generate_course_code(name, uni_initials, 0), name, ())
+    if error:
+        raise ValueError(error)
+    generated_code = generate_course_code(name, uni_initials, allocate_id("course", file_path))
+    return f"{generated_code},{name},{details}\n"
 
-    # Generate a unique ID seed using the sum of ASCII values of characters in the name
-    id_seed = sum(ord(char) for char in name) * len(name)
 
-    # Calculate a pseudo-random three-digit ID
-    random_id = (id_seed * 73) % 1000
+def generate_course_code(name, uni_initials, number):
+    """
+    Builds a course code from the initials of the course name, a number of the course
+    ID sequence zero padded to three digits and the university initials.
+    """
+    course_code = "".join(word[0].upper() for word in name.split())
+    return f"{course_code}{number:03d}-{uni_initials}"
 
-    # Ensuring it is zero padded to three digits
-    formatted_id = f"{random_id:03d}"
 
-    # Combining into a final generated code
-    generated_code = f"{course_code}{formatted_id}-{uni_initials}"
-    return f"{generated_code},{name},{details}\n"
+def validate_course_fields(course_code, name, existing_codes):
+    """Returns why a new course record is invalid, or None if it can be added."""
+    if not course_code or any(char.isspace() for char in course_code):
+        return "Course code must be a single word."
+    if not name:
+        return "Course name cannot be empty."
+    if course_code in existing_codes:
+        return f"Course code '{course_code}' already exists."
+    return None
 
 def write_to_course_file(file_path, content):
     """
@@ -126,46 +146,97 @@ def write_to_course_file(file_path, content):
         file.write(content.strip())
 
 
-def read_and_clean_file(file_path):
-    """
-    Helper function to read the contents of a file, and removes empty lines and leading whitespace,
-    and writes the cleaned content back to the file.
-    """
-    with open(file_path, "r") as file:
-        lines = [line.strip() for line in file if line.strip()]
-    with open(file_path, "w") as file:
-        for line in lines:
-            file.write(line + "\n")
-    return lines
-
-
 def add_course(file_path="courses.txt", log_file="admin_log.txt"):
     """
-    Adds a new course to the course file after cleaning the file and validating the input.
+    Adds a new course to the course file with a single append after validating the input.
+    Blank lines are left for the offline compaction command to remove.
     """
     try:
         # If the file exists, open in append mode
         with open(file_path, "a", encoding="utf-8"):
             pass
 
-        # Clean the file to remove empty lines
-        read_and_clean_file(file_path)
-
         # Get new course details from the user
-        course_data = get_course_details().strip()
+        course_data = get_course_details(file_path).strip()
+
+        # Look the generated code up in the primary key index of the courses
+        course_code, name = [field.strip() for field in (course_data.split(",") + [""])[:2]]
+        error = validate_course_fields(course_code, name, get_index(file_path))
+        if error:
+            raise ValueError(error)
 
         # Append the new course to the file
         append_to_file(file_path, course_data)
+        record_change(file_path, rows=1)
 
         print("Course added successfully.")
         input("Press Enter to continue...")
         log_message("Course added successfully.", log_file)
+    except ValueError as e:
+        print(f"Error: {e}")
+        log_message(f"Course not added: {e}", log_file)
     except Exception as e:
         error_message = f"An error occurred while adding the course: {e}"
         print(error_message)
         log_message(error_message, log_file)
 
 
+def import_courses(lines, file_path="courses.txt", uni_initials=None, log_file="admin_log.txt"):
+    """
+    Adds a catalogue of courses from lines in the format course_code,course_name[,details]
+    in a single append. Lines with an empty course code get a generated one, which needs
+    uni_initials. Codes are checked against the courses index and each other. Returns the
+    number of courses added and a list of (line number, line, reason) for the rejected lines.
+    """
+    existing_codes = get_index(file_path)
+    parsed = []
+    rejects = []
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        fields = [field.strip() for field in line.split(",", 2)]
+        if len(fields) < 2:
+            rejects.append((line_number, line, "Expected course_code,course_name[,details]."))
+            continue
+        if not fields[0] and not uni_initials:
+            rejects.append((line_number, line, "No course code given and no university initials to generate one."))
+            continue
+        if not fields[0]:
+            # Only input that can become a valid course takes a number of the sequence
+            error = validate_course_fields(generate_course_code(fields[1], uni_initials, 0), fields[1], ())
+            if error:
+                rejects.append((line_number, line, error))
+                continue
+        parsed.append((line_number, line, fields))
+
+    # Reserve every generated number with one update of the course sequence
+    generated = sum(1 for _, _, fields in parsed if not fields[0])
+    numbers = iter(allocate_ids("course", generated, file_path) if generated else [])
+    records = []
+    new_codes = set()
+    for line_number, line, fields in parsed:
+        course_code, name = fields[0], fields[1]
+        if not course_code:
+            course_code = generate_course_code(name, uni_initials, next(numbers))
+        error = validate_course_fields(course_code, name, existing_codes)
+        if not error and course_code in new_codes:
+            error = f"Course code '{course_code}' appears twice in the import."
+        if error:
+            rejects.append((line_number, line, error))
+            continue
+        new_codes.add(course_code)
+        # Lines without details get an empty details column
+        records.append(",".join([course_code, name, fields[2] if len(fields) > 2 else ""]))
+
+    if records:
+        append_to_file(file_path, records)
+        observe_ids("course", new_codes, file_path)
+        record_change(file_path, rows=len(records))
+    log_message(f"Course import: {len(records)} added, {len(rejects)} rejected.", log_file)
+    return len(records), sorted(rejects)
+
+
 def display_courses(file_path):
     """
     Reads and displays a list of courses from the specified file.
@@ -229,11 +300,11 @@ def remove_course(file_path="courses.txt", log_file="admin_log.txt"):
             print("Operation cancelled.")
             log_message("Course removal cancelled by user.", log_file)
             return
-        updated_courses = []
-        for course in courses:
-            if course not in matching_courses:
-                updated_courses.append(course)
-        overwrite_file(file_path, updated_courses)
+        keys = {record_key(file_path, course): None for course in matching_courses}
+        write_journal(file_path, [("D", key) for key in keys])
+        # A key-based delete drops every record with the key, not only the matches shown
+        deleted = sum(1 for course in courses if course and record_key(file_path, course) in keys)
+        record_change(file_path, rows=-deleted)
         print("Course(s) removed successfully!")
         for course in matching_courses:
             log_message(f"Course removed: {course}", log_file)
@@ -261,14 +332,12 @@ def update_course(file_path="courses.txt", log_file="admin_log.txt"):
             log_message("Invalid course update attempt (empty course code).", log_file)
             return
 
-        updated_courses = []
         course_found = False
 
         # Iterating through each course in the file
         for course in courses:
             split_course = course.split(",", 2)
             if len(split_course) < 3:
-                updated_courses.append(course)
                 continue
             current_code, current_name, current_details = split_course
 
@@ -282,11 +351,9 @@ def update_course(file_path="courses.txt", log_file="admin_log.txt"):
                 updated_name = new_name if new_name else current_name
                 updated_details = new_details if new_details else current_details
                 updated_course = f"{current_code},{updated_name},{updated_details.strip()}"
-                updated_courses.append(updated_course)
-            else:
-                updated_courses.append(course)
+                journal_upsert(file_path, updated_course)
+                break
         if course_found:
-            overwrite_file(file_path, [f"{line.strip()}\n" for line in updated_courses])
             print("Course updated successfully.")
             log_message(f"Course with code '{course_code}' updated successfully.", log_file)
         else:
@@ -380,9 +447,8 @@ def add_student(file_path="student_records.txt", courses_file="courses.txt", mod
         email = get_input("Enter the student's email: ")
         address = get_input("Enter the student's address: ")
         age = get_input("Enter the student's age: ")
-        student_id = generate_student_id(name)
         course = get_input("Enter the student's course (course code): ").strip()
-        if not validate_course(course, courses):
+        if lookup_record(courses_file, course) is None:
             log_error_and_exit(f"The course code {course} does not exist in {courses_file},"
                                f"An error has occurred while adding {name} to {course}.", log_file)
             return
@@ -395,23 +461,17 @@ def add_student(file_path="student_records.txt", courses_file="courses.txt", mod
             return
         intake_month = get_input("Enter the intake month: ")
         registration_month = get_input("Enter the registration month: ")
+        # The ID is only allocated once the record is known to be valid
+        student_id = generate_student_id(file_path)
         student_data = (f"{name},{student_id},{course},"
                         f"{','.join(valid_modules)},{intake_month},"
                         f"{registration_month},{phone_number},"
-                        f"{email},{address},{age}\n")
-
-        # Correcting the append_to_file by ensuring newline format
-        with open(file_path, "a", encoding="utf-8") as file:
+                        f"{email},{address},{age}")
 
-            # Move the pointer to the end of the file
-            file.seek(0, 2)
-
-            # Check if the file already has content
-            if file.tell() > 0:
-                # Add a newline if not present before appending new data
-                file.write("\n")
-
-            file.write(student_data)
+        if not append_to_file(file_path, student_data):
+            log_error_and_exit(f"Adding Student: {name} could not be written to {file_path}.", log_file)
+            return
+        record_change(file_path, rows=1)
 
         success_message = f"{name} added successfully to {file_path} with ID: {student_id}."
         print(success_message)
@@ -423,45 +483,187 @@ def add_student(file_path="student_records.txt", courses_file="courses.txt", mod
         log_error_and_exit(f"Add student: An error occurred while adding the {name}: {e}")
 
 
+def load_admission_details(lines):
+    """
+    Reads admission details from lines in the format
+    passport_number,phone_number,address,age,module_id,module_id,... into
+    {passport_number: (phone_number, address, age, [module IDs])}.
+    """
+    details = {}
+    for line in lines:
+        fields = [field.strip() for field in line.strip().split(",")]
+        if len(fields) >= 4 and fields[0]:
+            details[fields[0]] = (fields[1], fields[2], fields[3], [module for module in fields[4:] if module])
+    return details
+
+
+def admit_students(accepted_lines, details_lines=(), intake_month="", registration_month="",
+                   file_path="student_records.txt", courses_file="courses.txt", modules_file="modules_list.txt",
+                   log_file="admin_log.txt"):
+    """
+    Turns accepted registrations (name,email,passport_number,course) into student records
+    in a single append. The course may be given by code, by name, or by name and details
+    as the registration form stores it, and is resolved through maps built once. Phone
+    number, address, age and modules come from the optional admission details, keyed by
+    passport number, and modules are checked against the modules index. Registrations
+    whose email already belongs to a student are rejected as already admitted.
+    Returns the number of students admitted and a list of (line number, line, reason).
+    """
+    course_codes = get_index(courses_file)
+    codes_by_name = {}
+    for course_code, course_name, details in load_table(courses_file):
+        codes_by_name.setdefault(f"{course_name},{details}", course_code)
+        codes_by_name.setdefault(course_name, course_code)
+    module_ids = get_index(modules_file)
+    email_column = column_index(file_path, "email")
+    known_emails = {row[email_column].lower() for row in load_table(file_path)}
+    details = load_admission_details(details_lines)
+
+    admissions = []
+    rejects = []
+    for line_number, line in enumerate(accepted_lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        fields = [field.strip() for field in line.split(",", 3)]
+        if len(fields) < 4 or not fields[0]:
+            rejects.append((line_number, line, "Expected name,email,passport_number,course."))
+            continue
+        name, email, passport_number, course = fields
+        course_code = course if course in course_codes else codes_by_name.get(course)
+        if course_code is None:
+            rejects.append((line_number, line, f"Course '{course}' does not exist."))
+            continue
+        if email.lower() in known_emails:
+            rejects.append((line_number, line, f"A student with email '{email}' is already admitted."))
+            continue
+        phone_number, address, age, modules = details.get(passport_number, ("", "", "", []))
+        invalid_modules = [module for module in modules if module not in module_ids]
+        if invalid_modules:
+            rejects.append((line_number, line, f"Invalid module IDs: {', '.join(invalid_modules)}."))
+            continue
+        if age and not age.isdigit():
+            rejects.append((line_number, line, f"Age '{age}' is not a number."))
+            continue
+        known_emails.add(email.lower())
+        admissions.append((name, course_code, modules, phone_number, email, address, age))
+
+    records = []
+    if admissions:
+        # Reserve every student ID with one update of the student sequence
+        student_ids = allocate_ids("student", len(admissions), file_path)
+        for student_id, admission in zip(student_ids, admissions):
+            name, course_code, modules, phone_number, email, address, age = admission
+            records.append(",".join([name, str(student_id), course_code] + modules
+                                    + [intake_month, registration_month, phone_number, email, address, age]))
+        append_to_file(file_path, records)
+        record_change(file_path, rows=len(records))
+    log_message(f"Admission: {len(records)} students admitted, {len(rejects)} rejected.", log_file)
+    return len(records), rejects
+
+
 def get_input(prompt):
     return input(prompt).strip()
 
 
-def generate_student_id(name):
+def generate_student_id(file_path="student_records.txt"):
     """
     Function to generate a student ID,
-    Since importing random is not possible, this function will generate a random ID.
+    The ID is the next number of the persisted student ID sequence, so it is the same
+    in every run and never reused.
     """
-    return abs(hash(name)) % 1000000
+    return allocate_id("student", file_path)
 
 
-def filter_records(records, identifier):
-    # Check if the identifier is present in each record
-    return [record for record in records if identifier not in record]
+def delete_student_rows(file_path, id_column, student_ids):
+    """
+    Deletes every record of a file whose ID column is one of the given student IDs,
+    with one read of the file and one journal write. Returns the number of records deleted.
+    """
+    doomed = 0
+    keys = {}
+    for record in read_file(file_path):
+        fields = record.split(",")
+        if len(fields) > id_column and fields[id_column].strip() in student_ids:
+            doomed += 1
+            keys[record_key(file_path, record)] = None
+    if keys:
+        write_journal(file_path, [("D", key) for key in keys])
+    return doomed
+
+
+def remove_students(student_ids, file_path="student_records.txt", references=None, log_file="admin_log.txt"):
+    """
+    Removes a batch of students by exact ID from the student records and from every file
+    that refers to them, scanning each file once however many students are removed.
+    The referring files go first, so an interrupted removal only leaves students without
+    their related records, and running it again finishes the job.
+    Every file that lost records is compacted afterwards.
+    Returns {file: number of records deleted}, files that do not exist are skipped.
+    """
+    student_ids = {student_id.strip() for student_id in student_ids if student_id.strip()}
+    if references is None:
+        references = STUDENT_REFERENCES
+    removed = {}
+    for related_file, id_column in list(references.items()) + [(file_path, 1)]:
+        try:
+            removed[related_file] = delete_student_rows(related_file, id_column, student_ids)
+        except FileNotFoundError:
+            continue
+    touched = [related_file for related_file, count in removed.items() if count]
+    # Streaming reads load a whole file while it has a journal, so fold the deletions
+    # into the large logs such as the attendance records right away
+    for related_file in touched:
+        compact_file(related_file)
+    # Fee totals depend on the amounts that were removed, so the touched counters are recounted
+    refresh_stats(touched)
+    log_message(f"Removed {removed.get(file_path, 0)} students and their records: "
+                + ", ".join(f"{related_file} {count}" for related_file, count in removed.items()), log_file)
+    return removed
+
+
+def resolve_student_ids(identifiers, file_path="student_records.txt"):
+    """
+    Turns student IDs or exact student names into student IDs. Returns the IDs and the
+    identifiers that match no student or a name shared by several students.
+    """
+    ids_by_name = {}
+    student_ids = set()
+    for name, student_id, *_ in load_table(file_path):
+        ids_by_name.setdefault(name, []).append(student_id)
+        student_ids.add(student_id)
+    resolved, unresolved = [], []
+    for identifier in identifiers:
+        if identifier in student_ids:
+            resolved.append(identifier)
+        elif len(ids_by_name.get(identifier, [])) == 1:
+            resolved.append(ids_by_name[identifier][0])
+        else:
+            unresolved.append(identifier)
+    return resolved, unresolved
 
 
 def remove_student(file_path="student_records.txt", log_file="admin_log.txt"):
+    student_identifier = ""
     try:
-        # Get the identifier from the user
-        student_identifier = input("Enter the student name or ID to remove: ").strip()
-
-        # Read the student file
-        student_records = read_file(file_path)
-
-        # Filter out the record(s) matching the identifier
-        filtered_records = filter_records(student_records, student_identifier)
-
-        # If no records are removed, it means the identifier wasn't found
-        if len(filtered_records) == len(student_records):
+        # Get the identifiers from the user
+        student_identifier = input("Enter the student names or IDs to remove (comma-separated): ").strip()
+        identifiers = [identifier.strip() for identifier in student_identifier.split(",") if identifier.strip()]
+
+        # Match them exactly against the student records
+        student_ids, unresolved = resolve_student_ids(identifiers, file_path)
+        for identifier in unresolved:
+            print(f"'{identifier}' does not match exactly one student, use the student ID instead.")
+        if unresolved or not student_ids:
             print("No matching student found to remove.")
             return
 
-        # Write the updated records back to the file with proper formatting
-        with open(file_path, "w", encoding="utf-8") as file:
-            for record in filtered_records:
-                file.write(record.strip() + "\n")
+        # Remove the students together with their enrollments, attendance, grades and fees
+        removed = remove_students(student_ids, file_path, log_file=log_file)
+        related = sum(count for related_file, count in removed.items() if related_file != file_path)
 
-        success_message = f"{student_identifier} removed successfully."
+        success_message = (f"{', '.join(student_ids)} removed successfully, "
+                           f"along with {related} related records.")
         print(success_message)
         input("Press Enter to continue...")
         log_message(success_message, log_file)
@@ -481,8 +683,11 @@ def print_report(total_courses, total_students):
 
 def generate_report(course_file_path="courses.txt", student_file_path="student_records.txt", log_file="admin_log.txt"):
     try:
-        total_courses = len(read_file(course_file_path))
-        total_students = len(read_file(student_file_path))
+        # Read the totals from the dashboard counters, unless the report is asked for other files
+        stats = load_stats()
+        total_courses = stats["courses"] if course_file_path == "courses.txt" else count_rows(course_file_path)
+        total_students = (stats["students"] if student_file_path == "student_records.txt"
+                          else count_rows(student_file_path))
         print_report(total_courses, total_students)
         input("Press Enter to continue...")
         log_message("Report generated successfully.", log_file)
@@ -494,19 +699,19 @@ def generate_report(course_file_path="courses.txt", student_file_path="student_r
 
 
 def student_statistics(file_path="student_records.txt"):
-    students = read_file(file_path)
-    students = [student.strip() for student in students if student.strip()]
-    print(f"Total Students: {len(students)}")
-
-    courses = []
-    for student in students:
-        parts = student.split(",")
-        if len(parts) > 2:
-            courses.append(parts[2])
-
-    unique_courses = set(courses)
-    for course in unique_courses:
-        print(f"{course}: {courses.count(course)} student(s)")
+    """
+    Prints the number of students per course, intake month and registration month,
+    all counted in one pass over the student records.
+    """
+    counts = breakdowns(file_path, ("course", "intake_month", "registration_month"))
+    print(f"Total Students: {sum(counts['course'].values())}")
+
+    for column, title in (("course", "Students per Course"),
+                          ("intake_month", "Students per Intake Month"),
+                          ("registration_month", "Students per Registration Month")):
+        print(f"\n{title}:")
+        for value, count in counts[column].items():
+            print(f"{value}: {count} student(s)")
         input("Press Enter to continue...")
 
 
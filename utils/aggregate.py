@@ -0,0 +1,93 @@
+from utils.filehandling import iter_rows, iter_records, table_signature, cache_get, cache_put
+from utils.schema import column_index
+
+
+def aggregate(file_path, group_by=(), sums=(), distinct=()):
+    """
+    Computes group-by statistics of a data file in one streaming pass over its rows.
+    group_by, sums and distinct are column names. Returns {group: statistics}, where
+    group is the tuple of group_by values (an empty tuple without group_by) and
+    statistics holds "count", {"sums": {column: total}} and {"distinct": {column: count}}.
+    Results are cached until the file changes.
+    """
+    group_by, sums, distinct = tuple(group_by), tuple(sums), tuple(distinct)
+    signature = table_signature(file_path)
+    cache_key = ("aggregate", file_path, group_by, sums, distinct)
+    result = cache_get(cache_key, signature)
+    if result is not None:
+        return result
+
+    group_columns = [column_index(file_path, column) for column in group_by]
+    sum_columns = [(column, column_index(file_path, column)) for column in sums]
+    distinct_columns = [(column, column_index(file_path, column)) for column in distinct]
+    groups = {}
+    for row in iter_rows(file_path):
+        key = tuple(row[position] for position in group_columns)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {"count": 0,
+                                   "sums": {column: 0 for column in sums},
+                                   "distinct": {column: set() for column in distinct}}
+        group["count"] += 1
+        for column, position in sum_columns:
+            group["sums"][column] += row[position]
+        for column, position in distinct_columns:
+            group["distinct"][column].add(row[position])
+
+    # Only the number of distinct values is kept, not the values themselves
+    for group in groups.values():
+        group["distinct"] = {column: len(values) for column, values in group["distinct"].items()}
+    cache_put(cache_key, file_path, signature, groups)
+    return groups
+
+
+def count_rows(file_path):
+    """Returns the number of valid rows in a data file."""
+    return aggregate(file_path).get((), {"count": 0})["count"]
+
+
+def count_distinct(file_path, column):
+    """Returns the number of distinct values in a column of a data file."""
+    return aggregate(file_path, distinct=(column,)).get((), {"distinct": {column: 0}})["distinct"][column]
+
+
+def group_counts(file_path, column):
+    """Returns {value: number of rows} for a column of a data file, largest groups first."""
+    groups = aggregate(file_path, group_by=(column,))
+    return {key[0]: group["count"]
+            for key, group in sorted(groups.items(), key=lambda item: (-item[1]["count"], item[0]))}
+
+
+def column_total(file_path, column, invalid=None):
+    """
+    Sums a numeric column over the records of a data file, converting only that column,
+    so a row whose other fields do not parse, such as a malformed date, still counts.
+    Lines without a number in the column are skipped and passed to the invalid callback.
+    """
+    position = column_index(file_path, column)
+    total = 0.0
+    for fields in iter_records(file_path, maxsplit=position + 1):
+        try:
+            total += float(fields[position])
+        except (IndexError, ValueError):
+            if invalid is not None:
+                invalid(",".join(fields))
+    return total
+
+
+def breakdowns(file_path, columns):
+    """
+    Returns {column: {value: number of rows}} for several columns of a data file, all
+    counted in the same pass over the rows.
+    """
+    groups = aggregate(file_path, group_by=columns)
+    counts = {column: {} for column in columns}
+    for key, group in groups.items():
+        for column, value in zip(columns, key):
+            counts[column][value] = counts[column].get(value, 0) + group["count"]
+    return {column: dict(sorted(values.items(), key=lambda item: (-item[1], item[0])))
+            for column, values in counts.items()}
+
+
+if __name__ == "__main__":
+    print("Aggregate Module loaded.")
@@ -0,0 +1,144 @@
+from utils.filehandling import (read_file, iter_records, write_journal, overwrite_file, file_signature,
+                                table_signature, journal_path, cache_get, cache_put, update_cached, log_message)
+
+# Sidecar file holding passport_number,email,status for every applicant, plus a
+# #sources record with the signature of the registration files it was built from.
+APPLICANT_INDEX_FILE = "applicant_index.txt"
+
+# Registration files covered by the index with the status they stand for. A passport
+# found in several files takes the status of the last one, so a declined applicant
+# may apply again and an accepted one stays accepted.
+REGISTRATION_SOURCES = (
+    ("declined_registrations.txt", "declined"),
+    ("registrations.txt", "pending"),
+    ("accepted_registrations.txt", "accepted"),
+)
+
+# Applications with these statuses block another one with the same passport or email
+OPEN_STATUSES = ("pending", "accepted")
+
+SOURCES_KEY = "#sources"
+
+
+def registration_sources(file_path="registrations.txt", accepted_file="accepted_registrations.txt",
+                         declined_file="declined_registrations.txt"):
+    """Returns the index sources for a set of registration files, in REGISTRATION_SOURCES order."""
+    return (declined_file, "declined"), (file_path, "pending"), (accepted_file, "accepted")
+
+
+def sources_signature(sources=REGISTRATION_SOURCES):
+    """
+    Returns the signatures of the registration files and their journals as one string,
+    which changes whenever any of them is written.
+    """
+    parts = []
+    for file_path, _ in sources:
+        for signature in (file_signature(file_path), file_signature(journal_path(file_path))):
+            parts.append(f"{signature[0]}:{signature[1]}" if signature else "-")
+    return ";".join(parts)
+
+
+def add_applicant(index, passport_number, email, status):
+    """Records the status and email of a passport in the in-memory index."""
+    previous = index["passports"].get(passport_number)
+    if previous and index["emails"].get(previous[0]) == passport_number:
+        del index["emails"][previous[0]]
+    index["passports"][passport_number] = (email, status)
+    if email:
+        index["emails"][email] = passport_number
+
+
+def build_applicant_index(sources=REGISTRATION_SOURCES):
+    """
+    Builds the applicant index of the registration files as {"passports": {passport:
+    (email, status)}, "emails": {email: passport}}, with emails in lower case.
+    """
+    index = {"passports": {}, "emails": {}}
+    for file_path, status in sources:
+        try:
+            for fields in iter_records(file_path, maxsplit=3):
+                if len(fields) >= 3 and fields[2]:
+                    add_applicant(index, fields[2], fields[1].lower(), status)
+        except FileNotFoundError:
+            pass
+    return index
+
+
+def rebuild_applicant_index(sources=REGISTRATION_SOURCES, index_file=APPLICANT_INDEX_FILE):
+    """Rebuilds the applicant index from the registration files and rewrites the index file."""
+    index = build_applicant_index(sources)
+    index["sources"] = sources_signature(sources)
+    lines = [f"{SOURCES_KEY},{index['sources']}\n"]
+    lines.extend(f"{passport},{email},{status}\n" for passport, (email, status) in index["passports"].items())
+    update_cached(("applicants", index_file), index_file, index, lambda: overwrite_file(index_file, lines))
+    log_message(f"Applicant index rebuilt for {len(index['passports'])} passports.")
+    return index
+
+
+def load_applicant_index(sources=REGISTRATION_SOURCES, index_file=APPLICANT_INDEX_FILE):
+    """
+    Returns the applicant index. It is read from the index file once per change of that
+    file, and rebuilt from the registration files if they were changed behind its back.
+    """
+    if file_signature(index_file) is not None:
+        signature = table_signature(index_file)
+        index = cache_get(("applicants", index_file), signature)
+        if index is None:
+            index = {"passports": {}, "emails": {}, "sources": None}
+            for record in read_file(index_file):
+                fields = record.split(",")
+                if len(fields) == 2 and fields[0] == SOURCES_KEY:
+                    index["sources"] = fields[1]
+                elif len(fields) == 3:
+                    add_applicant(index, fields[0], fields[1], fields[2])
+            cache_put(("applicants", index_file), index_file, signature, index)
+        if index["sources"] == sources_signature(sources):
+            return index
+    return rebuild_applicant_index(sources, index_file)
+
+
+def record_applicants(index, applicants, sources=REGISTRATION_SOURCES, index_file=APPLICANT_INDEX_FILE):
+    """
+    Records (passport_number, email, status) entries in an index loaded before the
+    registration files were written, together with the new signature of those files,
+    using a single journal write.
+    """
+    applicants = [(passport_number, email.lower(), status) for passport_number, email, status in applicants]
+    if not applicants:
+        return
+    signature = sources_signature(sources)
+    entries = [("U", f"{passport_number},{email},{status}") for passport_number, email, status in applicants]
+    entries.append(("U", f"{SOURCES_KEY},{signature}"))
+
+    def apply(cached):
+        for applicant in applicants:
+            add_applicant(cached, *applicant)
+        cached["sources"] = signature
+
+    update_cached(("applicants", index_file), index_file, index, lambda: write_journal(index_file, entries), apply)
+
+
+def applicant_status(passport_number, sources=REGISTRATION_SOURCES, index_file=APPLICANT_INDEX_FILE):
+    """Returns 'pending', 'accepted' or 'declined' for a passport number, or None if it never applied."""
+    entry = load_applicant_index(sources, index_file)["passports"].get(passport_number)
+    return entry[1] if entry else None
+
+
+def find_open_application(index, passport_number, email):
+    """
+    Returns ("passport" or "email", status) for an open application that already uses
+    the passport number or email, or None if a new application may be made.
+    """
+    entry = index["passports"].get(passport_number)
+    if entry and entry[1] in OPEN_STATUSES:
+        return "passport", entry[1]
+    owner = index["emails"].get(email.lower())
+    if owner is not None and owner != passport_number:
+        status = index["passports"][owner][1]
+        if status in OPEN_STATUSES:
+            return "email", status
+    return None
+
+
+if __name__ == "__main__":
+    print("Applicants Module loaded.")
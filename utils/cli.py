@@ -0,0 +1,324 @@
+import argparse
+import math
+import sys
+
+from utils.admin import remove_students, resolve_student_ids, import_courses, admit_students
+from utils.accountant import record_payment, record_pending_fees, save_receipt
+from utils.aggregate import breakdowns
+from utils.stats import load_stats, rebuild_stats, verify_stats
+from utils.filehandling import log_message, compact_file, file_signature, JOURNAL_KEYS
+from utils.schema import SCHEMAS
+from utils.login import provision_users
+from utils.passwords import calibrate_iterations
+from utils.utility import student_exists
+from utils.lecturer import (import_attendance, import_grades, get_session_roster, record_session_attendance,
+                            rebuild_attendance_summary)
+
+
+def read_input_lines(source):
+    """Returns the lines of the given file, or of standard input when the source is '-'."""
+    if source == "-":
+        return sys.stdin.readlines()
+    with open(source, "r", encoding="utf-8") as file:
+        return file.readlines()
+
+
+def print_import_result(kind, recorded, rejects):
+    """Prints the outcome of a batch import and returns the process exit code."""
+    for line_number, line, reason in rejects:
+        print(f"Rejected line {line_number}: {line} ({reason})", file=sys.stderr)
+    print(f"{kind}: {recorded} recorded, {len(rejects)} rejected.")
+    return 1 if rejects else 0
+
+
+def attendance_import(args):
+    recorded, rejects = import_attendance(read_input_lines(args.file))
+    return print_import_result("Attendance", recorded, rejects)
+
+
+def attendance_session(args):
+    try:
+        roster = get_session_roster(args.module_id, args.date)
+    except ValueError as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+    absent = set(args.absent)
+    unknown = absent - {student_id for student_id, _ in roster}
+    if unknown:
+        print(f"Error: not enrolled in {args.module_id}: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 1
+    statuses = {student_id: "absent" if student_id in absent else "present" for student_id, _ in roster}
+    recorded = record_session_attendance(args.module_id, args.date, statuses)
+    if statuses and not recorded:
+        print(f"Error: attendance of {args.module_id} could not be written.", file=sys.stderr)
+        return 1
+    print(f"Attendance: {recorded} recorded, {len(absent)} absent.")
+    return 0
+
+
+def attendance_rebuild_summary(args):
+    pairs = rebuild_attendance_summary()
+    print(f"Attendance summary rebuilt: {pairs} module/student pairs.")
+    return 0
+
+
+def grades_import(args):
+    recorded, rejects = import_grades(read_input_lines(args.file))
+    return print_import_result("Grades", recorded, rejects)
+
+
+def users_provision(args):
+    created, rejects = provision_users(read_input_lines(args.file), admin_access_code=args.admin_code)
+    return print_import_result("Users", created, rejects)
+
+
+def users_calibrate(args):
+    iterations, seconds = calibrate_iterations(args.target_ms / 1000)
+    print(f"Password hashing set to {iterations} iterations ({seconds * 1000:.0f} ms per check).")
+    return 0
+
+
+def courses_import(args):
+    added, rejects = import_courses(read_input_lines(args.file), uni_initials=args.uni)
+    return print_import_result("Courses", added, rejects)
+
+
+def maintenance_compact(args):
+    # Every data and sidecar file by default, as long as it exists
+    file_paths = args.files or [file_path for file_path in dict.fromkeys(list(SCHEMAS) + list(JOURNAL_KEYS))
+                                if file_signature(file_path) is not None]
+    for file_path in file_paths:
+        compact_file(file_path)
+        print(f"{file_path}: compacted.")
+    return 0
+
+
+def students_admit(args):
+    details_lines = read_input_lines(args.details) if args.details else ()
+    admitted, rejects = admit_students(read_input_lines(args.file), details_lines,
+                                       args.intake_month, args.registration_month)
+    return print_import_result("Students", admitted, rejects)
+
+
+def students_remove(args):
+    identifiers = list(args.student_ids)
+    if args.from_file:
+        identifiers += [line.strip() for line in read_input_lines(args.from_file) if line.strip()]
+    student_ids, unresolved = resolve_student_ids(identifiers)
+    if unresolved:
+        print(f"Error: no single student matches {', '.join(unresolved)}", file=sys.stderr)
+        return 1
+    if not student_ids:
+        print("Error: no student IDs given.", file=sys.stderr)
+        return 1
+    removed = remove_students(student_ids)
+    for file_path, count in removed.items():
+        print(f"{file_path}: {count} records removed.")
+    return 0
+
+
+def fee_amount(value):
+    """Converts a fee amount argument, rejecting values that are not finite numbers."""
+    try:
+        amount = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid amount: '{value}'")
+    if not math.isfinite(amount):
+        raise argparse.ArgumentTypeError(f"amount must be a finite number: '{value}'")
+    return amount
+
+
+def validate_fee_arguments(args):
+    """Returns an error message for an unknown student or a non-positive amount, otherwise None."""
+    if not student_exists(args.student_id):
+        return f"Student ID '{args.student_id}' not found in the student records."
+    if args.amount <= 0:
+        return "Amount must be greater than zero."
+    return None
+
+
+def fees_pending(args):
+    error = validate_fee_arguments(args)
+    if error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+    record_pending_fees(args.student_id, args.amount)
+    print(f"Student {args.student_id} added to pending tuition fees record.")
+    return 0
+
+
+def fees_pay(args):
+    error = validate_fee_arguments(args)
+    if error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+    date_of_payment, record_found = record_payment(args.student_id, args.amount)
+    save_receipt(args.student_id, args.amount, date_of_payment)
+    if not record_found:
+        print(f"No pending record found for student {args.student_id}.")
+    print(f"Tuition fees recorded as paid for student {args.student_id} on {date_of_payment}.")
+    return 0
+
+
+def report_summary(args):
+    stats = load_stats()
+    print("--- University Summary ---")
+    print(f"Total Courses: {stats['courses']}")
+    print(f"Total Students: {stats['students']}")
+    print(f"Total Modules: {stats['modules']}")
+    print(f"Total Enrollments: {stats['enrollments']}")
+    print(f"Total Fees Collected: {stats['paid_fees']:.2f}")
+    print(f"Total Outstanding Fees: {stats['pending_fees']:.2f}")
+    print("--------------------------")
+    return 0
+
+
+def stats_verify(args):
+    mismatches = verify_stats()
+    for name, (stored, actual) in mismatches.items():
+        print(f"{name}: stored {stored}, actual {actual}", file=sys.stderr)
+    if not mismatches:
+        print("Dashboard counters are up to date.")
+        return 0
+    if args.rebuild:
+        rebuild_stats()
+        print(f"Dashboard counters rebuilt, {len(mismatches)} were out of date.")
+        return 0
+    return 1
+
+
+def stats_rebuild(args):
+    stats = rebuild_stats()
+    print(f"Dashboard counters rebuilt: {len(stats)} counters.")
+    return 0
+
+
+def report_students(args):
+    counts = breakdowns("student_records.txt", ("course", "intake_month", "registration_month"))
+    for column, values in counts.items():
+        print(f"--- Students per {column} ---")
+        for value, count in values.items():
+            print(f"{value}: {count}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="University Management System. Run without arguments for the interactive menus.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    attendance = commands.add_parser("attendance", help="Attendance records.")
+    attendance_commands = attendance.add_subparsers(dest="action", required=True)
+    attendance_import_parser = attendance_commands.add_parser(
+        "import", help="Record attendance from module_id,student_id,date,status lines.")
+    attendance_import_parser.add_argument("file", nargs="?", default="-", help="Input file, '-' for stdin.")
+    attendance_import_parser.set_defaults(handler=attendance_import)
+    attendance_session_parser = attendance_commands.add_parser(
+        "session", help="Mark every student enrolled in a module for one class session.")
+    attendance_session_parser.add_argument("module_id")
+    attendance_session_parser.add_argument("date", help="Session date (YYYY-MM-DD).")
+    attendance_session_parser.add_argument("--absent", nargs="*", default=[], metavar="STUDENT_ID",
+                                           help="Students to mark absent, everyone else is present.")
+    attendance_session_parser.set_defaults(handler=attendance_session)
+    attendance_commands.add_parser(
+        "rebuild-summary", help="Recount the attendance summary from the attendance log.").set_defaults(
+        handler=attendance_rebuild_summary)
+
+    grades = commands.add_parser("grades", help="Grade records.")
+    grades_commands = grades.add_subparsers(dest="action", required=True)
+    grades_import_parser = grades_commands.add_parser(
+        "import", help="Record grades from student_id,module_id,percentage lines.")
+    grades_import_parser.add_argument("file", nargs="?", default="-", help="Input file, '-' for stdin.")
+    grades_import_parser.set_defaults(handler=grades_import)
+
+    fees = commands.add_parser("fees", help="Tuition fee records.")
+    fees_commands = fees.add_subparsers(dest="action", required=True)
+    for action, handler, help_text in (("pending", fees_pending, "Add a pending tuition fees record."),
+                                       ("pay", fees_pay, "Mark tuition fees as paid and save a receipt.")):
+        fees_parser = fees_commands.add_parser(action, help=help_text)
+        fees_parser.add_argument("student_id")
+        fees_parser.add_argument("amount", type=fee_amount)
+        fees_parser.set_defaults(handler=handler)
+
+    users = commands.add_parser("users", help="User accounts.")
+    users_commands = users.add_subparsers(dest="action", required=True)
+    users_provision_parser = users_commands.add_parser(
+        "provision", help="Create accounts from username,password,role lines.")
+    users_provision_parser.add_argument("file", nargs="?", default="-", help="Input file, '-' for stdin.")
+    users_provision_parser.add_argument("--admin-code", help="Admin access code, required for Admin accounts.")
+    users_provision_parser.set_defaults(handler=users_provision)
+    users_calibrate_parser = users_commands.add_parser(
+        "calibrate", help="Pick the password hashing cost for a target login latency on this machine.")
+    users_calibrate_parser.add_argument("--target-ms", type=float, default=250,
+                                        help="Target time of one password check (default 250).")
+    users_calibrate_parser.set_defaults(handler=users_calibrate)
+
+    courses = commands.add_parser("courses", help="Course catalogue.")
+    courses_commands = courses.add_subparsers(dest="action", required=True)
+    courses_import_parser = courses_commands.add_parser(
+        "import", help="Add courses from course_code,course_name[,details] lines in one write.")
+    courses_import_parser.add_argument("file", nargs="?", default="-", help="Input file, '-' for stdin.")
+    courses_import_parser.add_argument("--uni", help="University initials for generating missing course codes.")
+    courses_import_parser.set_defaults(handler=courses_import)
+
+    students = commands.add_parser("students", help="Student records.")
+    students_commands = students.add_subparsers(dest="action", required=True)
+    students_admit_parser = students_commands.add_parser(
+        "admit", help="Create student records for accepted registrations in one write.")
+    students_admit_parser.add_argument("file", nargs="?", default="accepted_registrations.txt",
+                                       help="Accepted registrations, '-' for stdin (default accepted_registrations.txt).")
+    students_admit_parser.add_argument("--details", metavar="FILE",
+                                       help="passport_number,phone_number,address,age,module_id,... lines.")
+    students_admit_parser.add_argument("--intake-month", default="", help="Intake month of the new students.")
+    students_admit_parser.add_argument("--registration-month", default="",
+                                       help="Registration month of the new students.")
+    students_admit_parser.set_defaults(handler=students_admit)
+    students_remove_parser = students_commands.add_parser(
+        "remove", help="Remove students with their enrollments, attendance, grades and fee records.")
+    students_remove_parser.add_argument("student_ids", nargs="*", metavar="STUDENT_ID")
+    students_remove_parser.add_argument("--from-file", metavar="FILE",
+                                        help="Also remove the student IDs listed one per line, '-' for stdin.")
+    students_remove_parser.set_defaults(handler=students_remove)
+
+    stats = commands.add_parser("stats", help="Dashboard counters.")
+    stats_commands = stats.add_subparsers(dest="action", required=True)
+    stats_verify_parser = stats_commands.add_parser(
+        "verify", help="Recount every dashboard counter and report the ones that are out of date.")
+    stats_verify_parser.add_argument("--rebuild", action="store_true", help="Rebuild the counters if any is out of date.")
+    stats_verify_parser.set_defaults(handler=stats_verify)
+    stats_commands.add_parser("rebuild", help="Recount every dashboard counter.").set_defaults(
+        handler=stats_rebuild)
+
+    maintenance = commands.add_parser("maintenance", help="Offline upkeep of the data files.")
+    maintenance_commands = maintenance.add_subparsers(dest="action", required=True)
+    maintenance_compact_parser = maintenance_commands.add_parser(
+        "compact", help="Fold journals into their files and drop blank lines.")
+    maintenance_compact_parser.add_argument("files", nargs="*", metavar="FILE",
+                                            help="Files to compact (default: every data file).")
+    maintenance_compact_parser.set_defaults(handler=maintenance_compact)
+
+    report = commands.add_parser("report", help="Reports.")
+    report_commands = report.add_subparsers(dest="action", required=True)
+    report_commands.add_parser("summary", help="Print university and financial totals.").set_defaults(
+        handler=report_summary)
+    report_commands.add_parser(
+        "students", help="Print students per course, intake month and registration month.").set_defaults(
+        handler=report_students)
+
+    return parser
+
+
+def run_cli(argv):
+    """Runs one batch command without prompting and returns the process exit code."""
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except FileNotFoundError as e:
+        print(f"Error: File '{e.filename}' not found.", file=sys.stderr)
+        log_message(f"Batch command failed, file not found: {e.filename}")
+        return 1
+
+
+if __name__ == "__main__":
+    print("CLI Module loaded.")
@@ -0,0 +1,100 @@
+from utils.filehandling import (load_table, append_to_file, journal_delete, cache_get, cache_put, update_cached,
+                                table_signature)
+from utils.stats import record_change
+
+
+def build_enrollment_index(module_student_file="module_student_records.txt"):
+    """
+    Builds the enrollment index of a module/student file. The index holds forward
+    postings {module_id: {student_id: student_name}} and reverse postings
+    {student_id: {module_id: student_name}}, both in file order, and the number of
+    records stored for every pair as {(module_id, student_id): count}.
+    """
+    index = {"modules": {}, "students": {}, "copies": {}}
+    for module_id, student_id, student_name in load_table(module_student_file):
+        add_posting(index, module_id, student_id, student_name)
+    return index
+
+
+def add_posting(index, module_id, student_id, student_name):
+    """Adds a module/student pair to the forward and reverse postings of an enrollment index."""
+    index["modules"].setdefault(module_id, {})[student_id] = student_name
+    index["students"].setdefault(student_id, {})[module_id] = student_name
+    index["copies"][(module_id, student_id)] = index["copies"].get((module_id, student_id), 0) + 1
+
+
+def remove_posting(index, module_id, student_id):
+    """Drops a module/student pair from an enrollment index, along with postings left empty."""
+    for outer, inner, postings in ((module_id, student_id, index["modules"]),
+                                   (student_id, module_id, index["students"])):
+        postings[outer].pop(inner, None)
+        if not postings[outer]:
+            del postings[outer]
+    index["copies"].pop((module_id, student_id), None)
+
+
+def load_enrollment_index(module_student_file="module_student_records.txt"):
+    """
+    Returns the enrollment index of a module/student file. It is built once per change
+    of the file, and kept up to date in place by enroll_student and unenroll_student.
+    """
+    signature = table_signature(module_student_file)
+    index = cache_get(("enrollments", module_student_file), signature)
+    if index is None:
+        index = build_enrollment_index(module_student_file)
+        cache_put(("enrollments", module_student_file), module_student_file, signature, index)
+    return index
+
+
+def is_enrolled(module_id, student_id, module_student_file="module_student_records.txt"):
+    """Checks if a student is enrolled in a module, matching both IDs exactly."""
+    return student_id in load_enrollment_index(module_student_file)["modules"].get(module_id, {})
+
+
+def get_module_students(module_id, module_student_file="module_student_records.txt"):
+    """Returns the (student ID, student name) pairs of every student enrolled in a module."""
+    return list(load_enrollment_index(module_student_file)["modules"].get(module_id, {}).items())
+
+
+def get_student_modules(student_id, module_student_file="module_student_records.txt"):
+    """Returns the IDs of every module a student is enrolled in."""
+    return list(load_enrollment_index(module_student_file)["students"].get(student_id, {}))
+
+
+def enroll_student(module_id, student_id, student_name, module_student_file="module_student_records.txt"):
+    """
+    Enrolls a student in a module and updates the enrollment index with the new pair.
+    Returns False without writing anything if the student is already enrolled, and
+    raises OSError, leaving the index and counters alone, if the record was not written.
+    """
+    index = load_enrollment_index(module_student_file)
+    if student_id in index["modules"].get(module_id, {}):
+        return False
+    if not update_cached(("enrollments", module_student_file), module_student_file, index,
+                         lambda: append_to_file(module_student_file, f"{module_id},{student_id},{student_name}"),
+                         lambda cached: add_posting(cached, module_id, student_id, student_name)):
+        raise OSError(f"The enrollment could not be written to '{module_student_file}'.")
+    record_change(module_student_file, rows=1)
+    return True
+
+
+def unenroll_student(module_id, student_id, module_student_file="module_student_records.txt"):
+    """
+    Removes a student from a module through the journal and drops the pair from the
+    enrollment index. Returns the number of records removed, which is more than one
+    if the pair was stored twice, or 0 without writing anything if there is no such enrollment.
+    """
+    index = load_enrollment_index(module_student_file)
+    removed = index["copies"].get((module_id, student_id), 0)
+    if not removed:
+        return 0
+    # The key-based delete drops every stored copy of the pair
+    update_cached(("enrollments", module_student_file), module_student_file, index,
+                  lambda: journal_delete(module_student_file, f"{module_id},{student_id}"),
+                  lambda cached: remove_posting(cached, module_id, student_id))
+    record_change(module_student_file, rows=-removed)
+    return removed
+
+
+if __name__ == "__main__":
+    print("Enrollment Module loaded.")
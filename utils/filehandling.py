@@ -1,45 +1,530 @@
+import atexit
+import errno
+import os
+import time
+from datetime import datetime
+
+from utils.schema import get_parser, column_index, table_name
+
+# Primary key column of every indexed data file, keyed by file name.
+PRIMARY_KEYS = {
+    "modules_list.txt": 0,
+    "student_records.txt": 1,
+    "courses.txt": 0,
+    "user_data.txt": 0,
+}
+
+# Columns that identify a record in the journal of each data file. Files that are
+# not listed here are keyed by the whole record.
+JOURNAL_KEYS = {
+    "courses.txt": (0,),
+    "modules_list.txt": (0,),
+    "student_records.txt": (1,),
+    "module_student_records.txt": (0, 1),
+    "tuition_fees_pending.txt": (0,),
+    "attendance_records.txt.summary": (0, 1),
+    "user_data.txt": (0,),
+    "id_sequences.txt": (0,),
+    "university_stats.txt": (0,),
+    "applicant_index.txt": (0,),
+}
+
+# Journal key columns of sidecar files kept next to any data file, keyed by file
+# extension, for the files that are not listed in JOURNAL_KEYS by name.
+JOURNAL_KEY_SUFFIXES = {
+    ".summary": (0, 1),
+}
+
+# Number of journal entries after which the journal is folded into its base file.
+COMPACTION_THRESHOLD = 500
+
+# Buffered log records are written once this many are pending for a log file,
+# or once this many seconds have passed since the last flush.
+LOG_BUFFER_SIZE = 100
+LOG_FLUSH_INTERVAL = 5.0
+
+# Memory budget of the parsed-table cache, measured in bytes of the source files.
+TABLE_CACHE_BUDGET = 64 * 1024 * 1024
+
+# Cached tables and indexes: key -> (file_path, signature, value, cost). Keys are
+# ("rows", file_path) or ("index", file_path, key_column). The dictionary is kept in
+# least-recently-used order, so eviction starts from its first entry.
+_table_cache = {}
+
+# file_path -> number of entries currently in its journal.
+_journal_entries = {}
+
+# log_file -> formatted records waiting to be written, and the open handle of each log file.
+_log_buffers = {}
+_log_handles = {}
+_log_state = {"last_flush": time.monotonic()}
+
+
 def read_file(file_path):
     try:
+        finish_compaction(file_path)
         with open(file_path, "r", encoding="utf-8") as file:
-            return [line.strip() for line in file.readlines()]
+            records = [line.strip() for line in file.readlines()]
+        if os.path.exists(journal_path(file_path)):
+            records = merge_journal(file_path, records)
+        return records
     except FileNotFoundError as e:
         raise e
     except Exception as e:
         raise RuntimeError(f"An error occurred while reading the file: {e}") from e
 
 
+def iter_lines(file_path):
+    """
+    Yields the stripped lines of a file one at a time without loading the whole file.
+    Files with a pending journal are merged in memory first, so edits are never missed.
+    """
+    finish_compaction(file_path)
+    if os.path.exists(journal_path(file_path)):
+        yield from read_file(file_path)
+        return
+    with open(file_path, "r", encoding="utf-8") as file:
+        for line in file:
+            yield line.strip()
+
+
+def iter_records(file_path, column=None, value=None, maxsplit=-1):
+    """
+    Yields the stripped fields of every non-empty record in a file, lazily, so callers
+    can stop as soon as they have what they need. When a column and value are given,
+    only records whose column equals the value are split and yielded; lines are first
+    rejected with a prefix check (column 0) or a substring check (other columns).
+    """
+    for line in iter_lines(file_path):
+        if not line:
+            continue
+        if value is not None:
+            if column == 0:
+                if not line.startswith(value):
+                    continue
+            elif value not in line:
+                continue
+        fields = [field.strip() for field in line.split(",", maxsplit)]
+        if value is not None and (len(fields) <= column or fields[column] != value):
+            continue
+        yield fields
+
+
+def iter_rows(file_path, column=None, value=None, invalid=None):
+    """
+    Yields the rows of a registered data file as tuples of typed values (see
+    utils.schema), parsing every line exactly once. column may be a column name or
+    position and is filtered like iter_records. Lines that do not match the schema are
+    skipped, and passed to the invalid callback when one is given.
+    """
+    parse = get_parser(file_path)
+    if isinstance(column, str):
+        column = column_index(file_path, column)
+    for line in iter_lines(file_path):
+        if not line:
+            continue
+        if value is not None:
+            if column == 0:
+                if not line.startswith(value):
+                    continue
+            elif value not in line:
+                continue
+        row = parse(line)
+        if row is None:
+            if invalid is not None:
+                invalid(line)
+            continue
+        if value is not None and row[column] != value:
+            continue
+        yield row
+
+
+def journal_path(file_path):
+    """Returns the path of the append-only journal kept next to a data file."""
+    return f"{file_path}.journal"
+
+
+def compacting_path(file_path):
+    """Returns the path a journal is moved to while it is being folded into its data file."""
+    return f"{file_path}.journal.compacting"
+
+
+def finish_compaction(file_path):
+    """
+    Completes a compaction that was interrupted after its journal was set aside. If the
+    compacted file was not yet moved into place it is moved now; either way the set-aside
+    journal is dropped, so its entries are never applied twice.
+    """
+    if not os.path.exists(compacting_path(file_path)):
+        return
+    temporary_path = f"{file_path}.tmp"
+    if os.path.exists(temporary_path):
+        os.replace(temporary_path, file_path)
+    os.remove(compacting_path(file_path))
+    invalidate_cache(file_path)
+    log_message(f"Interrupted compaction of '{file_path}' completed.")
+
+
+def record_key(file_path, record):
+    """
+    Returns the journal key of a record, built from the key columns of its file.
+    Records that are too short for the key columns are keyed by the whole line.
+    """
+    file_name = table_name(file_path)
+    columns = JOURNAL_KEYS.get(file_name, JOURNAL_KEY_SUFFIXES.get("." + file_name.rpartition(".")[2]))
+    record = record.strip()
+    if columns is None:
+        return record
+    fields = record.split(",")
+    if len(fields) <= max(columns):
+        return record
+    return ",".join(fields[column].strip() for column in columns)
+
+
+def read_journal(file_path):
+    """Returns the entries of a file's journal as (operation, payload) pairs."""
+    try:
+        with open(journal_path(file_path), "r", encoding="utf-8") as journal:
+            entries = [line.rstrip("\n").split("\t", 1) for line in journal]
+    except FileNotFoundError:
+        return []
+    return [entry for entry in entries if len(entry) == 2]
+
+
+def merge_journal(file_path, records):
+    """
+    Applies the journal of a file on top of its base records.
+    'U' entries replace every record with the same key (or add it at the end),
+    'D' entries drop every record with the key and 'A' entries append a record.
+    """
+    positions = {}
+    for position, record in enumerate(records):
+        if record:
+            positions.setdefault(record_key(file_path, record), []).append(position)
+
+    for operation, payload in read_journal(file_path):
+        if operation == "A":
+            positions.setdefault(record_key(file_path, payload), []).append(len(records))
+            records.append(payload)
+        elif operation == "U":
+            key = record_key(file_path, payload)
+            existing = positions.get(key)
+            if existing:
+                records[existing[0]] = payload
+                for position in existing[1:]:
+                    records[position] = None
+                positions[key] = existing[:1]
+            else:
+                positions[key] = [len(records)]
+                records.append(payload)
+        elif operation == "D":
+            for position in positions.pop(payload, []):
+                records[position] = None
+    return [record for record in records if record is not None]
+
+
+def write_journal(file_path, entries):
+    """
+    Appends (operation, payload) entries to a file's journal and flushes them to disk,
+    so an edit is durable as soon as this returns. The journal is compacted once it
+    holds COMPACTION_THRESHOLD entries. Returns True, errors are raised.
+    """
+    finish_compaction(file_path)
+    path = journal_path(file_path)
+    if file_path not in _journal_entries:
+        _journal_entries[file_path] = len(read_journal(file_path))
+    with open(path, "a", encoding="utf-8") as journal:
+        journal.writelines(f"{operation}\t{payload.strip()}\n" for operation, payload in entries)
+        journal.flush()
+        os.fsync(journal.fileno())
+    _journal_entries[file_path] += len(entries)
+    invalidate_cache(file_path)
+    if _journal_entries[file_path] >= COMPACTION_THRESHOLD:
+        compact_file(file_path)
+    return True
+
+
+def journal_upsert(file_path, record):
+    """Records an insert-or-replace of a single record in the file's journal."""
+    write_journal(file_path, [("U", record)])
+    log_message(f"Record upserted in journal of '{file_path}'.")
+    return True
+
+
+def journal_delete(file_path, key):
+    """Records the deletion of every record with the given key in the file's journal."""
+    write_journal(file_path, [("D", key.strip())])
+    log_message(f"Record '{key.strip()}' deleted in journal of '{file_path}'.")
+    return True
+
+
+def compact_file(file_path):
+    """
+    Folds a file's journal into its base file. The merged records are written to a
+    temporary file which then atomically replaces the base file, so a crash never
+    leaves a half-written table behind. Blank lines are dropped on the way.
+    The journal is set aside before the base file is replaced, so a crash at any point
+    either keeps the old file with its journal or is completed by finish_compaction,
+    and the journal is never applied to the compacted file.
+    """
+    records = [record for record in read_file(file_path) if record]
+    temporary_path = f"{file_path}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as file:
+        file.writelines(f"{record}\n" for record in records)
+        file.flush()
+        os.fsync(file.fileno())
+    if os.path.exists(journal_path(file_path)):
+        os.replace(journal_path(file_path), compacting_path(file_path))
+        os.replace(temporary_path, file_path)
+        os.remove(compacting_path(file_path))
+    else:
+        os.replace(temporary_path, file_path)
+    _journal_entries[file_path] = 0
+    invalidate_cache(file_path)
+    log_message(f"File '{file_path}' compacted ({len(records)} records).")
+
+
+def file_signature(file_path):
+    """
+    Returns the (mtime_ns, size) pair of a file, or None if the file does not exist.
+    Any change to the file through this module or an editor changes its signature.
+    """
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def table_signature(file_path):
+    """
+    Returns the signature of a data file together with its journal, which changes
+    whenever the merged contents of the table may have changed.
+    """
+    finish_compaction(file_path)
+    base_signature = file_signature(file_path)
+    if base_signature is None:
+        raise FileNotFoundError(errno.ENOENT, f"The file '{file_path}' does not exist", file_path)
+    return base_signature, file_signature(journal_path(file_path))
+
+
+def cache_get(key, signature):
+    """Returns a cached value if it was built for the given signature, otherwise None."""
+    entry = _table_cache.pop(key, None)
+    if entry is None or entry[1] != signature:
+        return None
+    # Re-insert the entry so that it becomes the most recently used
+    _table_cache[key] = entry
+    return entry[2]
+
+
+def cache_put(key, file_path, signature, value):
+    """
+    Caches a value built from a data file and evicts the least recently used entries
+    until the cache fits in TABLE_CACHE_BUDGET. The cost of an entry is the size of the
+    file and journal it was built from.
+    """
+    cost = sum(part[1] for part in signature if part)
+    # Drop the previous entry first, so a refreshed value moves to the most recently used end
+    _table_cache.pop(key, None)
+    if cost > TABLE_CACHE_BUDGET:
+        return
+    _table_cache[key] = (file_path, signature, value, cost)
+    total_cost = sum(entry[3] for entry in _table_cache.values())
+    while total_cost > TABLE_CACHE_BUDGET:
+        oldest_key = next(iter(_table_cache))
+        total_cost -= _table_cache.pop(oldest_key)[3]
+
+
+def invalidate_cache(file_path):
+    """Drops every cached table and index built from the given file."""
+    for key in [key for key, entry in _table_cache.items() if entry[0] == file_path]:
+        del _table_cache[key]
+
+
+def update_cached(key, file_path, value, write, mutate=None):
+    """
+    Writes a change to a file and keeps the value cached for it under key current
+    without reading the file again. write() makes the change and returns whether it
+    succeeded. Only then is mutate(value) called to make the same change in memory, and
+    value cached for the new signature of the file. Returns whether the change was written.
+    """
+    if not write():
+        return False
+    if mutate is not None:
+        mutate(value)
+    cache_put(key, file_path, table_signature(file_path), value)
+    return True
+
+
+def load_table(file_path):
+    """
+    Returns every parsed row of a registered data file as a list of tuples. The rows
+    are shared through the process-wide cache and are only re-read once the file or
+    its journal changes, so treat the returned list as read-only.
+    """
+    signature = table_signature(file_path)
+    rows = cache_get(("rows", file_path), signature)
+    if rows is None:
+        rows = list(iter_rows(file_path))
+        cache_put(("rows", file_path), file_path, signature, rows)
+    return rows
+
+
+def get_primary_key(file_path):
+    """Returns the primary key column registered for a data file, or None."""
+    return PRIMARY_KEYS.get(table_name(file_path))
+
+
+def get_index(file_path, key_column=None):
+    """
+    Returns a dictionary mapping the key column of every record to its stripped fields.
+    The index is built once per file signature, so repeated lookups do not touch the
+    file again until it is modified. The first record wins when a key is duplicated,
+    matching the behaviour of a linear scan.
+    """
+    if key_column is None:
+        key_column = get_primary_key(file_path)
+        if key_column is None:
+            raise ValueError(f"No primary key registered for '{file_path}'.")
+
+    signature = table_signature(file_path)
+    cached = cache_get(("index", file_path, key_column), signature)
+    if cached is not None:
+        return cached
+
+    index = {}
+    for record in read_file(file_path):
+        if record:
+            fields = [field.strip() for field in record.split(",")]
+            if len(fields) > key_column:
+                index.setdefault(fields[key_column], fields)
+    cache_put(("index", file_path, key_column), file_path, signature, index)
+    return index
+
+
+def lookup_record(file_path, key, key_column=None):
+    """Returns the stripped fields of the record with the given key, or None."""
+    return get_index(file_path, key_column).get(key.strip())
+
+
 def overwrite_file(file_path, lines):
     try:
+        finish_compaction(file_path)
         with open(file_path, "w", encoding="utf-8") as file:
             file.writelines(lines)
+        # The new contents already include every journaled edit
+        if os.path.exists(journal_path(file_path)):
+            os.remove(journal_path(file_path))
+            _journal_entries[file_path] = 0
+        invalidate_cache(file_path)
         log_message(f"File '{file_path}' overwritten successfully.")
+        return True
     except Exception as e:
         print(f"An error occurred while overwriting the file: {e}")
         log_message(f"Error overwriting file '{file_path}': {e}")
+        return False
+
+
+def ends_without_newline(file_path):
+    """Checks if a file is not empty and its last line is not terminated by a newline."""
+    try:
+        with open(file_path, "rb") as file:
+            file.seek(0, os.SEEK_END)
+            if file.tell() == 0:
+                return False
+            file.seek(-1, os.SEEK_END)
+            return file.read(1) != b"\n"
+    except FileNotFoundError:
+        return False
 
 
 def append_to_file(file_path, data):
+    """
+    Appends a line, or a list of lines, to a data file, or to its journal while one is
+    pending. Errors are reported and logged. Returns whether the data was written.
+    """
     try:
+        finish_compaction(file_path)
+        if os.path.exists(journal_path(file_path)):
+            # Appends must be ordered after the pending journal entries
+            lines = data if isinstance(data, list) else [data]
+            write_journal(file_path, [("A", line) for line in lines if line.strip()])
+            log_message(f"Data appended to journal of '{file_path}' successfully.")
+            return True
+        # Terminate the last line first so the new data is not joined onto it
+        line_break = "\n" if ends_without_newline(file_path) else ""
         with open(file_path, "a", encoding="utf-8") as file:
+            file.write(line_break)
             if isinstance(data, list):
                 file.writelines([f"{line.strip()}\n" for line in data if line.strip()])
             else:
                 file.write(f"{data}\n")
+        invalidate_cache(file_path)
         log_message(f"Data appended to file '{file_path}' successfully.")
+        return True
     except Exception as e:
         print(f"An error occurred while appending to the file: {e}")
         log_message(f"Error appending to file '{file_path}': {e}")
+        return False
 
 
-def log_message(message, log_file="filehandling_log.txt"):
-    from datetime import datetime
+def log_message(message, log_file="filehandling_log.txt", flush=False):
+    """
+    Buffers a timestamped log record for the given log file. Records are written in
+    batches once LOG_BUFFER_SIZE are pending, LOG_FLUSH_INTERVAL seconds have passed
+    when the next record is logged, a menu is shown or the interpreter exits. Pass flush=True for events that must reach the disk before
+    the caller continues, such as financial transactions.
+    """
     try:
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        formatted_message = f"[{timestamp}] [Log File: {log_file}] {message}"
-        with open(log_file, "a", encoding="utf-8") as log:
-            log.write(formatted_message + "\n")
+        buffer = _log_buffers.setdefault(log_file, [])
+        buffer.append(f"[{timestamp}] [Log File: {log_file}] {message}\n")
+        if flush:
+            flush_logs(log_file, sync=True)
+        elif (len(buffer) >= LOG_BUFFER_SIZE
+              or time.monotonic() - _log_state["last_flush"] >= LOG_FLUSH_INTERVAL):
+            flush_logs()
     except Exception as e:
         print(f"An error occurred while writing to the log file: {e}")
 
+
+def flush_logs(log_file=None, sync=False):
+    """
+    Writes the buffered records of one log file, or of every log file when none is given,
+    through the handle kept open for that file. With sync=True the records are also
+    forced to disk.
+    """
+    log_files = [log_file] if log_file else list(_log_buffers)
+    for name in log_files:
+        buffer = _log_buffers.get(name)
+        if not buffer:
+            continue
+        handle = _log_handles.get(name)
+        if handle is None:
+            handle = open(name, "a", encoding="utf-8")
+            _log_handles[name] = handle
+        handle.writelines(buffer)
+        buffer.clear()
+        handle.flush()
+        if sync:
+            os.fsync(handle.fileno())
+    if log_file is None:
+        _log_state["last_flush"] = time.monotonic()
+
+
+def close_logs():
+    """Flushes every buffered log record and closes the open log files."""
+    try:
+        flush_logs()
+    except Exception as e:
+        print(f"An error occurred while writing to the log file: {e}")
+    for handle in _log_handles.values():
+        handle.close()
+    _log_handles.clear()
+
+
+atexit.register(close_logs)
+
 if __name__ == "__main__":
     print("Filehandling Module loaded.")
\ No newline at end of file
@@ -0,0 +1,104 @@
+from utils.filehandling import (read_file, iter_records, journal_upsert, file_signature, table_signature,
+                                cache_get, cache_put, update_cached, overwrite_file, log_message)
+
+# Holds kind,next_number for every ID kind that has been allocated from.
+SEQUENCE_FILE = "id_sequences.txt"
+
+# Data file and ID column that every kind of ID is allocated for.
+ID_KINDS = {
+    "module": ("modules_list.txt", 0),
+    "student": ("student_records.txt", 1),
+    "course": ("courses.txt", 0),
+}
+
+
+def id_number(identifier):
+    """
+    Returns the sequence number of an ID, which is the run of digits that ends its first
+    dash-separated part (MA0042-DB-JS -> 42, CS007-APU -> 7, 123456 -> 123456), or None.
+    """
+    head = identifier.split("-", 1)[0]
+    digits = len(head) - len(head.rstrip("0123456789"))
+    return int(head[-digits:]) if digits else None
+
+
+def highest_id_number(data_file, id_column):
+    """Returns the highest sequence number among the IDs already in a data file, or 0."""
+    highest = 0
+    try:
+        for fields in iter_records(data_file, maxsplit=id_column + 1):
+            if len(fields) > id_column:
+                number = id_number(fields[id_column])
+                if number is not None and number > highest:
+                    highest = number
+    except FileNotFoundError:
+        pass
+    return highest
+
+
+def load_sequences(sequence_file=SEQUENCE_FILE):
+    """Returns the next number of every ID kind as {kind: next_number}."""
+    if file_signature(sequence_file) is None:
+        overwrite_file(sequence_file, [])
+    signature = table_signature(sequence_file)
+    sequences = cache_get(("sequences", sequence_file), signature)
+    if sequences is None:
+        sequences = {}
+        for record in read_file(sequence_file):
+            fields = record.split(",")
+            if len(fields) == 2 and fields[1].isdigit():
+                sequences[fields[0]] = int(fields[1])
+        cache_put(("sequences", sequence_file), sequence_file, signature, sequences)
+    return sequences
+
+
+def allocate_ids(kind, count=1, data_file=None, sequence_file=SEQUENCE_FILE):
+    """
+    Reserves count consecutive sequence numbers of an ID kind and returns them. The
+    counter is persisted with a single journal write however many numbers are taken.
+    The first allocation of a kind starts above every number already used in its data
+    file, so new IDs never collide with existing ones, even after records are deleted.
+    """
+    if kind not in ID_KINDS:
+        raise ValueError(f"Unknown ID kind '{kind}'.")
+    sequences = load_sequences(sequence_file)
+    if kind in sequences:
+        first = sequences[kind]
+    else:
+        default_file, id_column = ID_KINDS[kind]
+        first = highest_id_number(data_file or default_file, id_column) + 1
+        log_message(f"ID sequence '{kind}' started at {first}.")
+
+    following = {kind: first + count}
+    update_cached(("sequences", sequence_file), sequence_file, sequences,
+                  lambda: journal_upsert(sequence_file, f"{kind},{following[kind]}"),
+                  lambda cached: cached.update(following))
+    return list(range(first, first + count))
+
+
+def observe_ids(kind, identifiers, data_file=None, sequence_file=SEQUENCE_FILE):
+    """
+    Moves the sequence of an ID kind past the numbers of IDs that were assigned outside
+    of it, e.g. imported with their own codes, so they are never allocated again.
+    """
+    numbers = [number for number in map(id_number, identifiers) if number is not None]
+    if not numbers:
+        return
+    sequences = load_sequences(sequence_file)
+    if kind not in sequences:
+        # The first allocation scans the data file, which already holds these IDs
+        return
+    if max(numbers) >= sequences[kind]:
+        following = {kind: max(numbers) + 1}
+        update_cached(("sequences", sequence_file), sequence_file, sequences,
+                      lambda: journal_upsert(sequence_file, f"{kind},{following[kind]}"),
+                      lambda cached: cached.update(following))
+
+
+def allocate_id(kind, data_file=None, sequence_file=SEQUENCE_FILE):
+    """Reserves a single sequence number of an ID kind."""
+    return allocate_ids(kind, 1, data_file, sequence_file)[0]
+
+
+if __name__ == "__main__":
+    print("IDs Module loaded.")
@@ -1,6 +1,24 @@
 from datetime import datetime
 
-from utils.filehandling import read_file, overwrite_file, append_to_file, log_message
+from utils.filehandling import (read_file, append_to_file, log_message, lookup_record, iter_records,
+                                iter_rows, file_signature, load_table, overwrite_file, write_journal,
+                                cache_get, cache_put, update_cached, table_signature)
+from utils.schema import column_index
+from utils.enrollment import is_enrolled, get_module_students, enroll_student, unenroll_student
+from utils.utility import student_exists
+from utils.pager import paginate
+
+
+def attendance_summary_path(attendance_file):
+    """
+    Returns the path of the sidecar file holding module_id,student_id,present,total for
+    every (module, student) pair of an attendance log.
+    """
+    return f"{attendance_file}.summary"
+
+
+# Summary file of the default attendance log
+ATTENDANCE_SUMMARY_FILE = attendance_summary_path("attendance_records.txt")
 
 
 def find_modules_by_lecturer(lecturer_id, modules_file="modules_list.txt"):
@@ -9,16 +27,12 @@ def find_modules_by_lecturer(lecturer_id, modules_file="modules_list.txt"):
     """
     modules = []
     try:
-        # Read the file contents,
-        records = read_file(modules_file)
-        # Process each record line by line,
-        for record in records:
-            # Split each record into fields by comma,
-            fields = record.strip().split(",")
-            # Check if the record has enough fields and the lecturer ID matches
-            if len(fields) >= 5 and fields[3] == lecturer_id:
-                # Add the module name (field index 1) to the list
-                modules.append(fields[1])
+        # Go through the cached module rows,
+        for row in load_table(modules_file):
+            # Check if the lecturer ID matches
+            if row[column_index(modules_file, "lecturer_id")] == lecturer_id:
+                # Add the module name to the list
+                modules.append(row[column_index(modules_file, "module_name")])
     except Exception as e:
         print(f"An error occurred while searching for modules: {e}")
         log_message(f"Error searching for modules for lecturer ID {lecturer_id}: {e}")
@@ -55,10 +69,8 @@ def module_exists(module_id, modules_list_file):
     """
     Checks if a module with the given ID exists in the specified modules list file.
     """
-    # Read all module records from the file
-    modules = read_file(modules_list_file)
-    # Check if any record's first field (module ID) matches the given module_id
-    return any(module_id == record.split(",")[0] for record in modules if record.strip())
+    # Look the module ID up in the primary key index of the modules list
+    return lookup_record(modules_list_file, module_id) is not None
 
 
 def get_student_name(student_id, student_records_file):
@@ -66,18 +78,11 @@ def get_student_name(student_id, student_records_file):
     Retrieves the name of a student based on their ID from the student records file.
     """
 
-    # Read all student records from the file,
-    student_records = read_file(student_records_file)
-
-    # Iterating through each record in the file
-    for record in student_records:
-        if record.strip():
-            fields = record.split(",")
-            if len(fields) > 1 and fields[1].strip() == student_id:
-                return fields[0].strip()
+    # Look the student ID up in the primary key index of the student records,
+    fields = lookup_record(student_records_file, student_id)
 
     # Return None if no matching student ID is found
-    return None
+    return fields[0] if fields else None
 
 
 def student_in_module(module_id, student_id, module_student_file):
@@ -87,11 +92,8 @@ def student_in_module(module_id, student_id, module_student_file):
     Each record is expected to have at least two fields: module ID and student ID, separated by commas.
     """
 
-    # Read all current entries from the module-student records file,
-    current_entries = read_file(module_student_file)
-
-    # Check if any record matches both the module_id and student_id
-    return any(f"{module_id},{student_id}" in record for record in current_entries if record.strip())
+    # Look the exact (module_id, student_id) pair up in the enrollment index
+    return is_enrolled(module_id, student_id, module_student_file)
 
 
 def add_student_to_module(module_student_file="module_student_records.txt",
@@ -120,14 +122,11 @@ def add_student_to_module(module_student_file="module_student_records.txt",
             log_message(f"Failed to add student: Student ID '{student_id}' does not exist.")
             return
 
-        # Check if the student is already enrolled in the module
-        if student_in_module(module_id, student_id, module_student_file):
+        # Append the new enrollment record, unless the student is already enrolled in the module
+        if not enroll_student(module_id, student_id, student_name, module_student_file):
             print(f"Error: The student ID '{student_id}' is already enrolled in the module '{module_id}'.")
             log_message(f"Failed to add student: Duplicate entry for Module ID '{module_id}' and Student ID '{student_id}'.")
             return
-
-        # Append the new enrollment record to the file
-        append_to_file(module_student_file, f"{module_id},{student_id},{student_name}")
         print("Student added to module successfully.")
         log_message(f"Student {student_id} ({student_name}) added to module {module_id}.")
         input("Press Enter to continue...")
@@ -147,22 +146,14 @@ def remove_student_from_module(module_student_file="module_student_records.txt",
         log_message(f"Failed to remove student: Module ID '{module_id}' does not exist.")
         return
     try:
-        records = read_file(module_student_file)
-        updated_records = [
-            record
-            for record in records
-            if not (record.startswith(f"{module_id},") and record.split(",")[1] == student_id)
-        ]
-        if len(updated_records) == len(records):
+        removed = unenroll_student(module_id, student_id, module_student_file)
+        if not removed:
             print(f"No matching record found for Student ID '{student_id}' in Module ID '{module_id}'.")
             log_message(f"No record found: Student ID '{student_id}' in Module ID '{module_id}'.")
         else:
-            overwrite_file(module_student_file, [f"{record.strip()}\n" for record in updated_records])
-            print("Updated Records:")
-            for updated_record in updated_records:
-                print(f"{updated_record}\n")
+            print(f"Removed: {module_id},{student_id} ({removed} record(s))")
             print("Student removed from the module successfully.")
-            log_message(f"Student ID '{student_id}' removed from Module ID '{module_id}'.")
+            log_message(f"Student ID '{student_id}' removed from Module ID '{module_id}': {removed} record(s).")
         input("Press Enter to continue...")
     except Exception as e:
         print(f"An error occurred while removing the student from the module: {e}")
@@ -170,16 +161,19 @@ def remove_student_from_module(module_student_file="module_student_records.txt",
         input("Press Enter to continue...")
 
 
+def get_enrolled_students(module_id, module_student_file="module_student_records.txt"):
+    """
+    Returns the (student ID, student name) pairs of every student enrolled in a module.
+    """
+    return get_module_students(module_id, module_student_file)
+
+
 def view_enrolled_students(module_student_file="module_student_records.txt"):
     module_id = input("Enter the Module ID: ").strip()
     try:
-        records = read_file(module_student_file)
-        students = [record.strip().split(",")[1] for record in records if record.startswith(module_id)]
+        students = [student_id for student_id, _ in get_enrolled_students(module_id, module_student_file)]
         if students:
-            print("Enrolled students:")
-            for student in students:
-                print(f"- {student}")
-                input("Press Enter to continue...")
+            paginate(students, lambda number, student: f"- {student}", "Enrolled students:")
             log_message(f"Viewed enrolled students for module ID: {module_id}")
         else:
             print("No students found for the module.")
@@ -188,6 +182,81 @@ def view_enrolled_students(module_student_file="module_student_records.txt"):
         log_message(f"Error viewing enrolled students: {e}")
 
 
+def rebuild_attendance_summary(attendance_file="attendance_records.txt",
+                               summary_file=None):
+    """
+    Recounts the present and total classes of every (module, student) pair from the
+    attendance log and rewrites the summary file. Returns the number of pairs.
+    Dates are not parsed, so a record with a malformed date is still counted, as it
+    was when append_attendance recorded it.
+    """
+    summary_file = summary_file or attendance_summary_path(attendance_file)
+    columns = [column_index(attendance_file, name) for name in ("module_id", "student_id", "status")]
+    summary = {}
+    for fields in iter_records(attendance_file):
+        if len(fields) <= max(columns):
+            continue
+        module_id, student_id, status = (fields[column] for column in columns)
+        counts = summary.setdefault((module_id, student_id), [0, 0])
+        if status.lower() == "present":
+            counts[0] += 1
+        counts[1] += 1
+    update_cached(("attendance_summary", summary_file), summary_file, summary,
+                  lambda: overwrite_file(summary_file, [f"{module_id},{student_id},{present},{total}\n"
+                                                        for (module_id, student_id), (present, total)
+                                                        in summary.items()]))
+    log_message(f"Attendance summary rebuilt from '{attendance_file}': {len(summary)} pairs.")
+    return len(summary)
+
+
+def load_attendance_summary(attendance_file="attendance_records.txt", summary_file=None):
+    """
+    Returns the attendance counters as {(module_id, student_id): [present, total]}.
+    The counters are read once per change of the summary file, and rebuilt from the
+    attendance log if the summary file does not exist yet. Every attendance log has its
+    own summary file next to it.
+    """
+    summary_file = summary_file or attendance_summary_path(attendance_file)
+    if file_signature(summary_file) is None:
+        rebuild_attendance_summary(attendance_file, summary_file)
+    signature = table_signature(summary_file)
+    summary = cache_get(("attendance_summary", summary_file), signature)
+    if summary is None:
+        summary = {}
+        for record in read_file(summary_file):
+            fields = record.split(",")
+            if len(fields) == 4:
+                summary[(fields[0], fields[1])] = [int(fields[2]), int(fields[3])]
+        cache_put(("attendance_summary", summary_file), summary_file, signature, summary)
+    return summary
+
+
+def append_attendance(records, attendance_file="attendance_records.txt", summary_file=None):
+    """
+    Appends module_id,student_id,date,status records to the attendance log and updates
+    the counters of the affected (module, student) pairs with one journal write.
+    The counters are left alone if the records could not be written. Returns whether
+    the records were written.
+    """
+    summary_file = summary_file or attendance_summary_path(attendance_file)
+    summary = load_attendance_summary(attendance_file, summary_file)
+    if not append_to_file(attendance_file, records):
+        return False
+    updated = {}
+    for record in records:
+        module_id, student_id, _, status = record.split(",")
+        pair = (module_id, student_id)
+        counts = updated.setdefault(pair, list(summary.get(pair, (0, 0))))
+        if status == "present":
+            counts[0] += 1
+        counts[1] += 1
+    return update_cached(("attendance_summary", summary_file), summary_file, summary,
+                         lambda: write_journal(summary_file, [("U", f"{module_id},{student_id},{present},{total}")
+                                                              for (module_id, student_id), (present, total)
+                                                              in updated.items()]),
+                         lambda cached: cached.update(updated))
+
+
 def give_attendance(attendance_file="attendance_records.txt",
                     modules_list_file="modules_list.txt",
                     student_records_file="student_records.txt"):
@@ -223,7 +292,9 @@ def give_attendance(attendance_file="attendance_records.txt",
 
         # Format and append the attendance record to the file
         attendance_record = f"{module_id},{student_id},{attendance_date},{status}"  # Create record
-        append_to_file(attendance_file, attendance_record)  # Append record to file
+        if not append_attendance([attendance_record], attendance_file):  # Append record to file
+            log_message(f"Failed to record attendance for student {student_id} in module {module_id}.")
+            return
         print("Attendance recorded successfully.")  # Success message
         input("Press Enter to continue...")
 
@@ -235,6 +306,80 @@ def give_attendance(attendance_file="attendance_records.txt",
         log_message(f"Error recording attendance: {error}")
 
 
+def record_session_attendance(module_id, attendance_date, statuses, attendance_file="attendance_records.txt"):
+    """
+    Writes the attendance of a whole class session in a single append.
+    statuses maps each student ID to 'present' or 'absent'. Returns the number of records written.
+    """
+    records = [f"{module_id},{student_id},{attendance_date},{status}" for student_id, status in statuses.items()]
+    if records and not append_attendance(records, attendance_file):
+        return 0
+    log_message(f"Session attendance recorded for module {module_id} on {attendance_date}: "
+                f"{len(records)} students.")
+    return len(records)
+
+
+def get_session_roster(module_id, attendance_date, modules_list_file="modules_list.txt",
+                       student_records_file="student_records.txt",
+                       module_student_file="module_student_records.txt"):
+    """
+    Validates a class session once and returns the (student ID, student name) pairs to mark.
+    Raises ValueError if the module or date is invalid. Enrolled students that are no longer
+    in the student records are left out.
+    """
+    if not module_exists(module_id, modules_list_file):
+        raise ValueError(f"Module ID '{module_id}' not found in the modules list.")
+    try:
+        datetime.strptime(attendance_date, "%Y-%m-%d")
+    except ValueError:
+        raise ValueError("Invalid date format. Please enter the date in YYYY-MM-DD format.") from None
+    roster = []
+    for student_id, student_name in get_enrolled_students(module_id, module_student_file):
+        if validate_student(student_id, student_records_file):
+            roster.append((student_id, student_name))
+        else:
+            log_message(f"Session attendance: enrolled student {student_id} is missing from the student records.")
+    return roster
+
+
+def give_session_attendance(attendance_file="attendance_records.txt",
+                            modules_list_file="modules_list.txt",
+                            student_records_file="student_records.txt",
+                            module_student_file="module_student_records.txt"):
+    """
+    Records attendance for every student enrolled in a module for one class session.
+    The module and date are validated once, each student is marked present unless the
+    lecturer enters 'a', and all records are written together at the end.
+    """
+    try:
+        module_id = input("Enter the Module ID: ").strip()
+        attendance_date = input("Enter the Date (YYYY-MM-DD): ").strip()
+        try:
+            roster = get_session_roster(module_id, attendance_date, modules_list_file,
+                                        student_records_file, module_student_file)
+        except ValueError as error:
+            print(f"Error: {error}")
+            log_message(f"Failed to record session attendance: {error}")
+            return
+        if not roster:
+            print(f"No students are enrolled in module {module_id}.")
+            return
+
+        print("Press Enter to mark a student present, or type 'a' to mark them absent.")
+        statuses = {}
+        for student_id, student_name in roster:
+            answer = input(f"{student_id} ({student_name}) [P/a]: ").strip().lower()
+            statuses[student_id] = "absent" if answer in ("a", "absent") else "present"
+
+        recorded = record_session_attendance(module_id, attendance_date, statuses, attendance_file)
+        absent = sum(1 for status in statuses.values() if status == "absent")
+        print(f"Attendance recorded for {recorded} students ({absent} absent).")
+        input("Press Enter to continue...")
+    except Exception as error:
+        print(f"An error occurred while recording session attendance: {error}")
+        log_message(f"Error recording session attendance: {error}")
+
+
 def parse_and_validate_record(record, module_id, min_fields):
     """This pretty much parses and validates a single record,
     I found this on closed thread in stackoverflow."""
@@ -246,47 +391,29 @@ def parse_and_validate_record(record, module_id, min_fields):
 
 def validate_student(student_id, student_records_file="student_records.txt"):
     """Check if student_id exists in student_records.txt."""
-    records = read_file(student_records_file)
-    for record in records:
-        fields = record.strip().split(",")
-        if len(fields) > 1 and fields[1].strip() == student_id:
-            return True
-    return False
+    return student_exists(student_id, student_records_file)
 
 
 def validate_module(module_id, modules_list_file="modules_list.txt"):
     """Check if module_id exists in modules_list.txt."""
-    records = read_file(modules_list_file)
-    for record in records:
-        fields = record.strip().split(",")
-        if fields[0].strip() == module_id:
-            return True
-    return False
+    return lookup_record(modules_list_file, module_id) is not None
 
 
 def get_total_classes(module_id, modules_list_file="modules_list.txt"):
     """Fetch number of classes to be attended for the module."""
-    records = read_file(modules_list_file)
-    for record in records:
-        fields = record.strip().split(",")
-        if fields[0].strip() == module_id:
-            return int(fields[5])  # Index 5 is number of classes to attend
+    fields = lookup_record(modules_list_file, module_id)
+    classes_column = column_index(modules_list_file, "classes")
+    if fields and len(fields) > classes_column:
+        return int(fields[classes_column])
     return 0
 
 
 def calculate_attendance(student_id, module_id, attendance_file="attendance_records.txt"):
     """Calculate attendance percentage."""
     try:
-        records = read_file(attendance_file)
-        attended_classes = 0
-        total_classes_attended = 0
-
-        for record in records:
-            fields = record.strip().split(",")
-            if len(fields) == 4 and fields[0] == module_id and fields[1] == student_id:
-                if fields[3].strip().lower() == "present":
-                    attended_classes += 1  # Increment for each present
-                total_classes_attended += 1  # Increment for all classes attended by the student
+        # Read the counters of the pair from the attendance summary
+        attended_classes, total_classes_attended = load_attendance_summary(attendance_file).get(
+            (module_id, student_id), (0, 0))
 
         module_classes = get_total_classes(module_id)
         if module_classes == 0:
@@ -319,6 +446,70 @@ def view_attendance():
     calculate_attendance(student_id, module_id)
 
 
+def import_attendance(lines, attendance_file="attendance_records.txt",
+                      modules_list_file="modules_list.txt",
+                      student_records_file="student_records.txt"):
+    """
+    Records attendance non-interactively from lines in the format module_id,student_id,date,status.
+    Every line is validated like give_attendance does, and all valid records are written in a
+    single append. Returns the number of records written and a list of (line number, line, reason)
+    for the rejected lines.
+    """
+    records = []
+    rejects = []
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        fields = [field.strip() for field in line.split(",")]
+        if len(fields) != 4:
+            rejects.append((line_number, line, "Expected module_id,student_id,date,status."))
+            continue
+        module_id, student_id, date_input, status = fields
+        status = status.lower()
+        if not module_exists(module_id, modules_list_file):
+            rejects.append((line_number, line, f"Module ID '{module_id}' does not exist."))
+            continue
+        if not get_student_name(student_id, student_records_file):
+            rejects.append((line_number, line, f"Student ID '{student_id}' does not exist."))
+            continue
+        try:
+            attendance_date = datetime.strptime(date_input, "%Y-%m-%d").date()
+        except ValueError:
+            rejects.append((line_number, line, "Invalid date format, expected YYYY-MM-DD."))
+            continue
+        if status not in ["present", "absent"]:
+            rejects.append((line_number, line, "Invalid attendance status, expected Present or Absent."))
+            continue
+        records.append(f"{module_id},{student_id},{attendance_date},{status}")
+
+    if records and not append_attendance(records, attendance_file):
+        return 0, rejects
+    log_message(f"Attendance import: {len(records)} recorded, {len(rejects)} rejected.")
+    return len(records), rejects
+
+
+def get_distinction(grade_percentage):
+    """Returns the distinction awarded for a grade percentage."""
+    if 30 <= grade_percentage < 45:
+        return "D-"
+    elif 45 <= grade_percentage < 55:
+        return "D+"
+    elif 55 <= grade_percentage < 60:
+        return "C-"
+    elif 60 <= grade_percentage < 65:
+        return "C+"
+    elif 65 <= grade_percentage < 70:
+        return "B-"
+    elif 70 <= grade_percentage < 80:
+        return "B+"
+    elif 80 <= grade_percentage < 90:
+        return "A-"
+    elif 90 <= grade_percentage <= 100:
+        return "A+"
+    return "Fail"
+
+
 def add_grade(grades_file="grades_records.txt",
               student_records_file="student_records.txt",
               modules_list_file="modules_list.txt",
@@ -356,24 +547,7 @@ def add_grade(grades_file="grades_records.txt",
             return
 
         # Determine Distinction
-        if 30 <= grade_percentage < 45:
-            distinction = "D-"
-        elif 45 <= grade_percentage < 55:
-            distinction = "D+"
-        elif 55 <= grade_percentage < 60:
-            distinction = "C-"
-        elif 60 <= grade_percentage < 65:
-            distinction = "C+"
-        elif 65 <= grade_percentage < 70:
-            distinction = "B-"
-        elif 70 <= grade_percentage < 80:
-            distinction = "B+"
-        elif 80 <= grade_percentage < 90:
-            distinction = "A-"
-        elif 90 <= grade_percentage <= 100:
-            distinction = "A+"
-        else:
-            distinction = "Fail"
+        distinction = get_distinction(grade_percentage)
 
         # Save the Grade Record
         grade_record = f"{student_id},{module_id},{grade_percentage},{distinction}"
@@ -386,33 +560,73 @@ def add_grade(grades_file="grades_records.txt",
         log_message(f"Error adding grade: {e}")
 
 
+def import_grades(lines, grades_file="grades_records.txt",
+                  student_records_file="student_records.txt",
+                  modules_list_file="modules_list.txt",
+                  module_student_file="module_student_records.txt"):
+    """
+    Records grades non-interactively from lines in the format student_id,module_id,percentage.
+    Every line is validated like add_grade does, and all valid records are written in a single
+    append. Returns the number of grades written and a list of (line number, line, reason) for
+    the rejected lines.
+    """
+    records = []
+    rejects = []
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        fields = [field.strip() for field in line.split(",")]
+        if len(fields) != 3:
+            rejects.append((line_number, line, "Expected student_id,module_id,percentage."))
+            continue
+        student_id, module_id, percentage = fields
+        if not get_student_name(student_id, student_records_file):
+            rejects.append((line_number, line, f"Student ID '{student_id}' does not exist."))
+            continue
+        if not module_exists(module_id, modules_list_file):
+            rejects.append((line_number, line, f"Module ID '{module_id}' does not exist."))
+            continue
+        if not student_in_module(module_id, student_id, module_student_file):
+            rejects.append((line_number, line, f"Student ID '{student_id}' is not enrolled in '{module_id}'."))
+            continue
+        try:
+            grade_percentage = float(percentage)
+        except ValueError:
+            rejects.append((line_number, line, "Grade percentage is not numeric."))
+            continue
+        if grade_percentage < 0 or grade_percentage > 100:
+            rejects.append((line_number, line, "Grade percentage must be between 0 and 100."))
+            continue
+        records.append(f"{student_id},{module_id},{grade_percentage},{get_distinction(grade_percentage)}")
+
+    if records:
+        append_to_file(grades_file, records)
+    log_message(f"Grade import: {len(records)} recorded, {len(rejects)} rejected.")
+    return len(records), rejects
+
+
 def view_grades(grades_file="grades_records.txt"):
     module_id = input("Enter the Module ID: ").strip()
     if not module_id:
         print("Module ID cannot be empty.")
         return
     try:
-        records = read_file(grades_file)
-        if not records:
+        signature = file_signature(grades_file)
+        if signature is None:
+            raise FileNotFoundError(grades_file)
+        if signature[1] == 0:
             print("The grades file is empty or missing.")
             input("Press Enter to continue...")
             log_message("Attempt to view grades failed: empty or missing file")
             return
-        grades = []
-        for record in records:
-            try:
-                fields = record.strip().split(",")
-                if len(fields) < 4:
-                    raise ValueError(f"Invalid record format: {record}")
-                if fields[1].strip() == module_id:
-                    grades.append(fields)
-            except ValueError as ve:
-                log_message(f"Skipped invalid record: {ve}")
+        grades = list(iter_rows(grades_file, "module_id", module_id,
+                                invalid=lambda record: log_message(
+                                    f"Skipped invalid record: Invalid record format: {record}")))
         if grades:
-            print(f"Grades for Module ID: {module_id}")
-            for grade in grades:
-                print(f"Student ID: {grade[0]}, Grade: {grade[2]}%, Distinction: {grade[3]}")
-            input("Press Enter to continue...")
+            paginate(grades, lambda number, grade: f"Student ID: {grade[0]}, Grade: {grade[2]}%, "
+                                                   f"Distinction: {grade[3]}",
+                     f"Grades for Module ID: {module_id}")
             log_message(f"Viewed grades for module ID: {module_id}")
         else:
             print("No grades found for the module.")
@@ -1,8 +1,25 @@
+import secrets
+import time
+
+from utils.filehandling import append_to_file, log_message, get_index, journal_upsert
+from utils.passwords import hash_password, is_legacy_hash, needs_rehash, verify_password
+
+VALID_ROLES = ["Student", "Lecturer", "Accountant", "Admin", "Registrar"]
+ADMIN_ACCESS_CODE = "1234"
+
+# Seconds of inactivity after which a staff session has to log in again
+SESSION_TIMEOUT = 30 * 60
+
+# The session of the user logged in to this process, empty when nobody is logged in
+_session = {}
+
+
 def encrypt(password, shift=3):
     """
     Encrypts a password using a Caesar cipher-like encryption technique. Each character
     in the password is shifted by a specified value, wrapping around within the range of
     valid character codes.
+    Only used to check legacy records, new passwords are hashed with utils.passwords.
     """
     encrypted = "".join(chr((ord(char) + shift) % 256) for char in password)
     return encrypted
@@ -36,21 +53,42 @@ def handle_role(role):
         print(f"Invalid role: {role}. No menu available.")
 
 
+def load_usernames(user_file="user_data.txt"):
+    """
+    Returns the username index of the user data file, or an empty one if the file
+    does not exist yet.
+    """
+    try:
+        return get_index(user_file, key_column=0)
+    except FileNotFoundError:
+        return {}
+
+
+def validate_new_user(username, role, taken_usernames):
+    """
+    Checks a new account against the registration rules and returns an error message,
+    or None if the account is valid. taken_usernames must support fast membership tests.
+    """
+    if not username or "," in username:
+        return "Username cannot be empty or contain commas."
+    if username in taken_usernames:
+        return "Username already exists. Please try another."
+    if role not in VALID_ROLES:
+        return "Invalid role. Please choose from the available roles."
+    return None
+
+
 def register_user(user_file="user_data.txt"):
     """
     This interface registers a new user by storing his credentials and role in the system. Validates user details
     for unique usernames, password matching, and proper role selection. Handles special
     Test cases to register admin users by requiring a valid admin access code.
+    The username is checked against the username index and the account is appended as a single record.
     """
-    valid_roles = ["Student", "Lecturer", "Accountant", "Admin", "Registrar"]
-    try:
-        with open(user_file, "r", encoding="utf-8") as file:
-            users = [line.strip().split(",") for line in file if line.strip()]
-    except FileNotFoundError:
-        users = []
+    users = load_usernames(user_file)
 
     username = input("Enter a username: ").strip()
-    if any(user[0] == username for user in users):
+    if username in users:
         print("Error: Username already exists. Please try another.")
         return
 
@@ -62,36 +100,65 @@ def register_user(user_file="user_data.txt"):
 
     print("Available roles: student, lecturer, accountant, registrar and admin")
     role = input("Enter your role: ").strip().capitalize()
-    if role not in valid_roles:
-        print("Invalid role. Please choose from the available roles.")
+    error = validate_new_user(username, role, users)
+    if error:
+        print(f"Error: {error}")
         return
 
-    encrypted_password = encrypt(password)
-    users.append([username, encrypted_password, role])
-
     if role == "Admin":
-        admin_access_code = "1234"
         entered_code = input("Enter the admin access code to register as admin: ").strip()
-        if entered_code != admin_access_code:
+        if entered_code != ADMIN_ACCESS_CODE:
             print("Invalid access code. You cannot register as an admin.")
             return
 
-    with open(user_file, "w", encoding="utf-8") as file:
-        for user in users:
-            file.write(",".join(user) + "\n")
+    append_to_file(user_file, f"{username},{hash_password(password)},{role}")
     print(f"User '{username}' registered successfully as {role}.")
 
 
+def provision_users(lines, user_file="user_data.txt", admin_access_code=None):
+    """
+    Creates many accounts from username,password,role lines in one validated pass and a
+    single append. Admin accounts are only created when the admin access code is given.
+    Returns the number of accounts created and a list of (line number, line, reason) for
+    the rejected lines.
+    """
+    taken_usernames = set(load_usernames(user_file))
+    records = []
+    rejects = []
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        fields = [field.strip() for field in line.split(",")]
+        if len(fields) != 3 or not fields[1]:
+            rejects.append((line_number, line, "Expected username,password,role."))
+            continue
+        username, password, role = fields[0], fields[1], fields[2].capitalize()
+        error = validate_new_user(username, role, taken_usernames)
+        if not error and role == "Admin" and admin_access_code != ADMIN_ACCESS_CODE:
+            error = "Admin accounts require the admin access code."
+        if error:
+            rejects.append((line_number, username, error))
+            continue
+        taken_usernames.add(username)
+        records.append(f"{username},{hash_password(password)},{role}")
+
+    if records:
+        append_to_file(user_file, records)
+    log_message(f"User provisioning: {len(records)} created, {len(rejects)} rejected.")
+    return len(records), rejects
+
+
 def login(user_file="user_data.txt"):
     """
     Logs a user in with a check against stored user data via their username and password.
-    It reads the user data from a specified file. Passwords are encrypted for security.
-    It returns the role of the authenticated user in case of a match.
+    The user is looked up in the username index of the user data file, which is only
+    re-read after the file changes. Passwords are checked against salted PBKDF2 hashes,
+    and legacy or outdated hashes are upgraded on a successful login.
+    On a match a session is started and the role of the authenticated user is returned.
     """
-    from utils.filehandling import log_message
     try:
-        with open(user_file, "r", encoding="utf-8") as file:
-            users = [line.strip().split(",") for line in file if line.strip()]
+        users = get_index(user_file, key_column=0)
     except FileNotFoundError:
         print(f"Error: User data file '{user_file}' not found. Please register first.")
         log_message(f"Error: User data file '{user_file}' not found. Please register first.")
@@ -100,18 +167,74 @@ def login(user_file="user_data.txt"):
     entered_username = input("Enter your username: ").strip()
     entered_password = input("Enter your password: ").strip()
 
-    encrypted_entered_password = encrypt(entered_password)
-
-    for user in users:
-        stored_username, stored_password, stored_role = user
-        if entered_username == stored_username and encrypted_entered_password == stored_password:
-            print(f"Login successful! Welcome, {entered_username}.")
-            return stored_role
+    user = users.get(entered_username)
+    if user and len(user) == 3 and check_password(entered_username, entered_password, user[1]):
+        print(f"Login successful! Welcome, {entered_username}.")
+        if needs_rehash(user[1]):
+            upgrade_password_hash(entered_username, entered_password, user[2], user_file)
+        start_session(entered_username, user[2])
+        return user[2]
 
     print("Invalid username or password. Please try again.")
     return None
 
 
+def check_password(username, password, stored_password):
+    """
+    Checks a password against its stored value, which is either a PBKDF2 hash or a
+    legacy Caesar-shifted password from before hashing was introduced.
+    """
+    if is_legacy_hash(stored_password):
+        return encrypt(password) == stored_password
+    return verify_password(password, stored_password, username)
+
+
+def upgrade_password_hash(username, password, role, user_file="user_data.txt"):
+    """Replaces a legacy or outdated password hash with one made under the current policy."""
+    new_hash = hash_password(password)
+    journal_upsert(user_file, f"{username},{new_hash},{role}")
+    # Remember the new hash so that the next login does not derive it again
+    verify_password(password, new_hash, username)
+    log_message(f"Password hash of '{username}' upgraded.")
+
+
+def start_session(username, role):
+    """
+    Starts the session of a logged in user, replacing any previous session.
+    The session holds a random token that identifies it in the logs.
+    """
+    now = time.monotonic()
+    _session.clear()
+    _session.update({"username": username, "role": role, "token": secrets.token_hex(16),
+                     "started_at": now, "last_seen": now})
+    log_message(f"Session {_session['token'][:8]} started for '{username}' ({role}).")
+    return _session
+
+
+def end_session():
+    """Ends the current session, if any."""
+    if _session:
+        log_message(f"Session {_session['token'][:8]} ended for '{_session['username']}'.")
+    _session.clear()
+
+
+def get_session():
+    """Returns the current session, or None if nobody is logged in or the session expired."""
+    if not _session:
+        return None
+    if time.monotonic() - _session["last_seen"] > SESSION_TIMEOUT:
+        end_session()
+        return None
+    _session["last_seen"] = time.monotonic()
+    return _session
+
+
+def has_role(role):
+    """Checks whether the current session belongs to a user with the given role."""
+    session = get_session()
+    return session is not None and session["role"] == role
+
+
 def load_user_data(file_path):
     """
     The function load_user_data reads user data from a file, processes it line by line, and
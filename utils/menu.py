@@ -1,13 +1,17 @@
 from utils.accountant import *
 from utils.admin import *
+from utils.filehandling import flush_logs
 from utils.lecturer import *
-from utils.login import login, register_user, handle_role
+from utils.login import login, register_user, handle_role, has_role, end_session
 from utils.registrar import *
 from utils.student import *
 from utils.utility import *
 
 
 def display_menu(menu_options):
+    # The program is about to wait for input, so buffered log records are written now
+    # rather than on whichever log call happens after the user answers
+    flush_logs()
     print("\n--- Menu ---")
     for idx, option in enumerate(menu_options, start=1):
         print(f"{idx}. {option}")
@@ -20,6 +24,8 @@ def handle_menu(menu_options, actions, logout_message="Logging out..."):
         if choice.isdigit():
             choice = int(choice)
             if choice == 0:
+                # Logging out ends the session, so the next menu asks for a login again
+                end_session()
                 print(logout_message)
                 break
             elif 1 <= choice <= len(actions):
@@ -33,7 +39,20 @@ def handle_menu(menu_options, actions, logout_message="Logging out..."):
             print("Invalid input. Please enter a number.")
 
 
+def require_role(role, menu_name):
+    """
+    Checks the current session for the given role, so that a menu can be opened
+    without logging in again. Prints an access denied message otherwise.
+    """
+    if has_role(role):
+        return True
+    print(f"Access denied. You are not authorized to access the {menu_name}.")
+    return False
+
+
 def admin_menu():
+    if not require_role("Admin", "Admin Menu"):
+        return
     menu_options = [
         "Add Course",
         "Remove Course",
@@ -68,6 +87,8 @@ def lecturer_menu():
     """
     Displays and handles actions for the Lecturer Menu.
     """
+    if not require_role("Lecturer", "Lecturer Menu"):
+        return
     menu_options = [
         "View Assigned Modules",
         "Add Student to Module",
@@ -75,6 +96,7 @@ def lecturer_menu():
         "View Enrolled Students",
         "Search Student In Module",
         "Give Attendance",
+        "Give Session Attendance",
         "View Attendance",
         "Add Grades",
         "View Grades"
@@ -87,6 +109,7 @@ def lecturer_menu():
         view_enrolled_students,
         search_student_in_module,
         give_attendance,
+        give_session_attendance,
         view_attendance,
         add_grade,
         view_grades
@@ -99,6 +122,8 @@ def accountant_menu():
     """
     Displays and handles actions for the Accountant Menu.
     """
+    if not require_role("Accountant", "Accountant Menu"):
+        return
     menu_options = [
         "Record Tuition Fees",
         "View Outstanding Fees",
@@ -119,6 +144,8 @@ def registrar_menu():
     """
     Displays and handles actions for the Registrar Menu.
     """
+    if not require_role("Registrar", "Registrar Menu"):
+        return
     menu_options = [
         "Register Student",
         "View Registration Records",
@@ -179,6 +206,9 @@ def student_menu():
 def staff_menu(user_file="user_data.txt"):
     """
     Displays the staff menu with role-based access control.
+    A login starts a session, so the role menus of the logged in user can be
+    reopened without logging in again until the user logs out of a role menu
+    or the staff menu is exited.
     """
     menu_options = [
         "Admin Menu",
@@ -196,33 +226,25 @@ def staff_menu(user_file="user_data.txt"):
         choice = input("Enter your choice: ").strip()
 
         if choice == "1":
-            print("Accessing Admin Menu requires admin login.")
-            user_role = login(user_file)
-            if user_role == "Admin":
-                admin_menu()
-            else:
-                print("Access denied. You are not authorized to access the Admin Menu.")
+            if not has_role("Admin"):
+                print("Accessing Admin Menu requires admin login.")
+                login(user_file)
+            admin_menu()
         elif choice == "2":
-            print("Accessing Lecturer Menu requires lecturer login.")
-            user_role = login(user_file)
-            if user_role == "Lecturer":
-                lecturer_menu()
-            else:
-                print("Access denied. You are not authorized to access the Lecturer Menu.")
+            if not has_role("Lecturer"):
+                print("Accessing Lecturer Menu requires lecturer login.")
+                login(user_file)
+            lecturer_menu()
         elif choice == "3":
-            print("Accessing Accountant Menu requires accountant login.")
-            user_role = login(user_file)
-            if user_role == "Accountant":
-                accountant_menu()
-            else:
-                print("Access denied. You are not authorized to access the Accountant Menu.")
+            if not has_role("Accountant"):
+                print("Accessing Accountant Menu requires accountant login.")
+                login(user_file)
+            accountant_menu()
         elif choice == "4":
-            print("Accessing Registrar Menu requires registrar login.")
-            user_role = login(user_file)
-            if user_role == "Registrar":
-                registrar_menu()
-            else:
-                print("Access denied. You are not authorized to access the Registrar Menu.")
+            if not has_role("Registrar"):
+                print("Accessing Registrar Menu requires registrar login.")
+                login(user_file)
+            registrar_menu()
         elif choice == "5":
             register_user(user_file)
         elif choice == "6":
@@ -230,6 +252,7 @@ def staff_menu(user_file="user_data.txt"):
             if role:
                 handle_role(role)
         elif choice == "7":
+            end_session()
             print("Exiting the system. Goodbye!")
             break
         else:
@@ -0,0 +1,181 @@
+import os
+import struct
+
+from utils.filehandling import (read_file, file_signature, table_signature, journal_path, finish_compaction,
+                                cache_get, cache_put, log_message)
+
+# Records shown per page unless a view asks for another size
+DEFAULT_PAGE_SIZE = 10
+
+# The offsets file starts with the (mtime_ns, size) signature of the data file it was
+# built for, followed by the byte offset of every non-empty line, all as 8-byte integers.
+HEADER_FORMAT = "<qq"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+OFFSET_SIZE = struct.calcsize("<Q")
+
+
+def offsets_path(file_path):
+    """Returns the path of the line offsets kept next to a data file."""
+    return file_path + ".offsets"
+
+
+def build_line_offsets(file_path):
+    """
+    Records the byte offset of every non-empty line of a data file in its offsets file,
+    tagged with the signature of the data file. Returns the number of lines.
+    """
+    signature = file_signature(file_path)
+    if signature is None:
+        raise FileNotFoundError(file_path)
+    offsets = []
+    position = 0
+    with open(file_path, "rb") as file:
+        for line in file:
+            if line.strip():
+                offsets.append(position)
+            position += len(line)
+
+    temp_path = offsets_path(file_path) + ".tmp"
+    try:
+        with open(temp_path, "wb") as file:
+            file.write(struct.pack(HEADER_FORMAT, *signature))
+            file.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+        os.replace(temp_path, offsets_path(file_path))
+    except OSError as e:
+        log_message(f"Could not save the line offsets of '{file_path}': {e}")
+    return len(offsets)
+
+
+def line_offsets_count(file_path):
+    """
+    Returns the number of lines in the offsets file of a data file, rebuilding the
+    offsets first if the data file changed since they were recorded.
+    """
+    signature = file_signature(file_path)
+    if signature is None:
+        raise FileNotFoundError(file_path)
+    try:
+        with open(offsets_path(file_path), "rb") as file:
+            header = file.read(HEADER_SIZE)
+            if len(header) == HEADER_SIZE and struct.unpack(HEADER_FORMAT, header) == signature:
+                return (os.fstat(file.fileno()).st_size - HEADER_SIZE) // OFFSET_SIZE
+    except OSError:
+        pass
+    return build_line_offsets(file_path)
+
+
+def journaled_records(file_path):
+    """
+    Returns the non-empty merged records of a file with a pending journal. Line offsets
+    do not apply until the journal is compacted, so these are kept in memory instead.
+    """
+    signature = table_signature(file_path)
+    records = cache_get(("pages", file_path), signature)
+    if records is None:
+        records = [record for record in read_file(file_path) if record]
+        cache_put(("pages", file_path), file_path, signature, records)
+    return records
+
+
+def count_records(source):
+    """Returns the number of records of a data file, or of a list of records."""
+    if not isinstance(source, str):
+        return len(source)
+    # The journal and offsets only describe the table once an interrupted compaction is done
+    finish_compaction(source)
+    if os.path.exists(journal_path(source)):
+        return len(journaled_records(source))
+    return line_offsets_count(source)
+
+
+def read_records(source, start, count):
+    """
+    Returns up to count records of a data file or list, starting at position start.
+    Records of a data file are read by seeking to their offsets, so only the requested
+    lines are read however large the file is.
+    """
+    if not isinstance(source, str):
+        return source[start:start + count]
+    finish_compaction(source)
+    if os.path.exists(journal_path(source)):
+        return journaled_records(source)[start:start + count]
+
+    count = max(0, min(count, line_offsets_count(source) - start))
+    if count == 0:
+        return []
+    with open(offsets_path(source), "rb") as file:
+        file.seek(HEADER_SIZE + start * OFFSET_SIZE)
+        offsets = struct.unpack(f"<{count}Q", file.read(count * OFFSET_SIZE))
+    records = []
+    with open(source, "rb") as file:
+        for offset in offsets:
+            file.seek(offset)
+            records.append(file.readline().decode("utf-8").strip())
+    return records
+
+
+def get_record(source, position):
+    """Returns the record at a position of a data file or list, or None if there is none."""
+    if position < 0:
+        return None
+    records = read_records(source, position, 1)
+    return records[0] if records else None
+
+
+def paginate(source, format_record, title, page_size=DEFAULT_PAGE_SIZE, on_choice=None, options=(),
+             exit_label="Exit"):
+    """
+    Shows the records of a data file, or of a list, page by page. format_record(number,
+    record) returns the text printed for a record, numbered from 1. Any choice other than
+    paging is passed to on_choice, and paging ends with its result once that is not None.
+    options are extra menu lines describing those choices. Pressing Enter or E returns None.
+    """
+    total = count_records(source)
+    if total == 0:
+        return None
+    last_page = (total - 1) // page_size
+    page = 0
+
+    while True:
+        start = page * page_size
+        print(f"\n{title}")
+        print("-" * 50)
+        for number, record in enumerate(read_records(source, start, page_size), start + 1):
+            print(format_record(number, record))
+        print("-" * 50)
+        print(f"Page {page + 1} of {last_page + 1}")
+
+        print("\nOptions:")
+        if page < last_page:
+            print("N. Next Page")
+        if page > 0:
+            print("P. Previous Page")
+        if last_page > 0:
+            print("G. Go to Page")
+        for option in options:
+            print(option)
+        print(f"E. {exit_label}")
+
+        choice = input("Enter your choice: ").strip().lower()
+        if choice in ("", "e"):
+            return None
+        if choice == "n" and page < last_page:
+            page += 1
+        elif choice == "p" and page > 0:
+            page -= 1
+        elif choice == "g" and last_page > 0:
+            target = input(f"Enter a page number (1-{last_page + 1}): ").strip()
+            if target.isdigit() and 1 <= int(target) <= last_page + 1:
+                page = int(target) - 1
+            else:
+                print("Invalid page number.")
+        elif on_choice is not None:
+            result = on_choice(choice)
+            if result is not None:
+                return result
+        else:
+            print("Invalid option. Please try again.")
+
+
+if __name__ == "__main__":
+    print("Pager Module loaded.")
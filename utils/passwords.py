@@ -0,0 +1,132 @@
+import hashlib
+import hmac
+import secrets
+import time
+
+from utils.filehandling import file_signature, log_message
+
+# Stored hashes look like pbkdf2_sha256$<iterations>$<salt hex>$<digest hex>
+ALGORITHM = "pbkdf2_sha256"
+DEFAULT_ITERATIONS = 200000
+MINIMUM_ITERATIONS = 100000
+POLICY_FILE = "password_policy.txt"
+
+# Key for the in-process cache of verified credentials, never stored anywhere
+_cache_key = secrets.token_bytes(32)
+# username -> (stored hash, keyed digest of the password that verified against it)
+_verified_credentials = {}
+# policy file -> (signature, iterations)
+_policy_cache = {}
+
+
+def get_iterations(policy_file=POLICY_FILE):
+    """
+    Returns the PBKDF2 iteration count new hashes are created with. The count comes from
+    the policy file written by calibrate_iterations, or DEFAULT_ITERATIONS without one.
+    """
+    signature = file_signature(policy_file)
+    if signature is None:
+        return DEFAULT_ITERATIONS
+    cached = _policy_cache.get(policy_file)
+    if cached and cached[0] == signature:
+        return cached[1]
+    try:
+        with open(policy_file, "r", encoding="utf-8") as file:
+            iterations = max(int(file.read().strip()), MINIMUM_ITERATIONS)
+    except ValueError:
+        log_message(f"Invalid password policy in '{policy_file}', using {DEFAULT_ITERATIONS} iterations.")
+        iterations = DEFAULT_ITERATIONS
+    _policy_cache[policy_file] = (signature, iterations)
+    return iterations
+
+
+def derive(password, salt, iterations):
+    """Derives the PBKDF2-SHA256 digest of a password."""
+    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+
+
+def hash_password(password, iterations=None):
+    """Hashes a password with a new random salt and returns the string to store."""
+    if iterations is None:
+        iterations = get_iterations()
+    salt = secrets.token_bytes(16)
+    return f"{ALGORITHM}${iterations}${salt.hex()}${derive(password, salt, iterations).hex()}"
+
+
+def parse_hash(stored):
+    """Returns (iterations, salt, digest) of a stored hash, or None for legacy or malformed values."""
+    parts = stored.split("$")
+    if len(parts) != 4 or parts[0] != ALGORITHM:
+        return None
+    try:
+        return int(parts[1]), bytes.fromhex(parts[2]), bytes.fromhex(parts[3])
+    except ValueError:
+        return None
+
+
+def is_legacy_hash(stored):
+    """Checks whether a stored password predates PBKDF2 hashing."""
+    return parse_hash(stored) is None
+
+
+def needs_rehash(stored):
+    """Checks whether a stored password is legacy or weaker than the current policy."""
+    parsed = parse_hash(stored)
+    return parsed is None or parsed[0] < get_iterations()
+
+
+def verify_password(password, stored, username=None):
+    """
+    Verifies a password against a stored PBKDF2 hash. When a username is given, a
+    successful check is remembered for this process, so that verifying the same
+    credentials again does not pay the key-derivation cost.
+    """
+    parsed = parse_hash(stored)
+    if parsed is None:
+        return False
+    keyed_digest = hmac.new(_cache_key, password.encode("utf-8"), hashlib.sha256).digest()
+    cached = _verified_credentials.get(username) if username is not None else None
+    if cached and cached[0] == stored and hmac.compare_digest(cached[1], keyed_digest):
+        return True
+
+    iterations, salt, digest = parsed
+    if not hmac.compare_digest(derive(password, salt, iterations), digest):
+        return False
+    if username is not None:
+        _verified_credentials[username] = (stored, keyed_digest)
+    return True
+
+
+def forget_credentials(username):
+    """Drops the cached verification of a user, e.g. after their password changes."""
+    _verified_credentials.pop(username, None)
+
+
+def calibrate_iterations(target_seconds=0.25, sample_iterations=20000, policy_file=POLICY_FILE):
+    """
+    Measures PBKDF2 on this machine and writes the iteration count that makes one
+    password check take about target_seconds to the policy file. The count never goes
+    below MINIMUM_ITERATIONS. Returns the chosen count and the measured seconds per check.
+    """
+    salt = secrets.token_bytes(16)
+    # Take the fastest of a few samples to avoid counting start-up noise
+    sample_seconds = min(time_password_check(salt, sample_iterations) for _ in range(3))
+    iterations = int(target_seconds / sample_seconds * sample_iterations)
+    iterations = max(MINIMUM_ITERATIONS, iterations // 1000 * 1000)
+    measured_seconds = time_password_check(salt, iterations)
+
+    with open(policy_file, "w", encoding="utf-8") as file:
+        file.write(f"{iterations}\n")
+    log_message(f"Password hashing calibrated to {iterations} iterations ({measured_seconds:.3f}s per check).")
+    return iterations, measured_seconds
+
+
+def time_password_check(salt, iterations):
+    """Returns the seconds one key derivation with the given iteration count takes."""
+    start = time.perf_counter()
+    derive("calibration-password", salt, iterations)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    print("Passwords Module loaded.")
@@ -1,69 +1,82 @@
-from utils.filehandling import read_file, append_to_file
+import os
+
+from utils.filehandling import read_file, append_to_file, iter_records, write_journal, log_message
+from utils.search import search_courses
+from utils.pager import paginate, count_records, get_record
+from utils.applicants import (load_applicant_index, record_applicants, find_open_application,
+                              applicant_status, registration_sources)
+
+# Decisions of the registration review in progress, as decision<TAB>registration line
+DECISIONS_FILE = "registration_decisions.txt"
 
 
 def display_paginated_courses(file_path, page_size=5):
     """
     Displays courses from a file in a paginated menu for easier browsing.
     If the file is empty or not formatted correctly, appropriate messages are displayed.
+    Courses can also be found by name through the ranked course search.
+    Only the courses of the page shown are read from the file.
     """
+    def format_course(number, record):
+        course = record.split(",", 1)
+        if len(course) == 2:
+            return f"{number}. {course[1].strip()} (ID: {course[0].strip()})"
+        return f"{number}. Invalid course entry: {record}"
+
+    def choose_course(choice):
+        if choice.isdigit():
+            record = get_record(file_path, int(choice) - 1)
+            if record is None:
+                print("Invalid selection. Please try again.")
+                return None
+            course_entry = record.split(",", 1)
+            if len(course_entry) == 2:
+                return course_entry[1].strip()  # Return course name
+            print("Invalid course entry. Please select again.")
+        elif choice == "s":
+            return select_course_by_search(file_path, page_size)
+        else:
+            print("Invalid option. Please try again.")
+        return None
+
     try:
-        courses = read_file(file_path)
-        if not courses:
+        if count_records(file_path) == 0:
             print("No courses available in the file.")
             return None
-
-        total_courses = len(courses)
-        current_page = 0
-
-        while True:
-            start_index = current_page * page_size
-            end_index = start_index + page_size
-
-            print("\nAvailable Courses:")
-            print("-" * 40)
-            for i in range(start_index, min(end_index, total_courses)):
-                course = courses[i].strip().split(",", 1)
-                if len(course) == 2:
-                    # Using list indexing
-                    course_id = course[0]
-                    course_name = course[1]
-                    print(f"{i + 1}. {course_name.strip()} (ID: {course_id.strip()})")
-                else:
-                    print(f"{i + 1}. Invalid course entry: {courses[i]}")
-            print("-" * 40)
-
-            print("\nOptions:")
-            if end_index < total_courses:
-                print("N. Next Page")
-            if current_page > 0:
-                print("P. Previous Page")
-            print("Enter the number corresponding to a course to select it.")
-            print("E. Exit Course Selection")
-
-            choice = input("Enter your choice: ").strip().lower()
-
-            if choice == "n" and end_index < total_courses:
-                current_page += 1
-            elif choice == "p" and current_page > 0:
-                current_page -= 1
-            elif choice.isdigit():
-                selected_index = int(choice) - 1
-                if 0 <= selected_index < total_courses:
-                    course_entry = courses[selected_index].strip().split(",", 1)
-                    if len(course_entry) == 2:
-                        return course_entry[1].strip()  # Return course name
-                    print("Invalid course entry. Please select again.")
-                else:
-                    print("Invalid selection. Please try again.")
-            elif choice == "e":
-                return None
-            else:
-                print("Invalid option. Please try again.")
+        return paginate(file_path, format_course, "Available Courses:", page_size, choose_course,
+                        options=("S. Search Courses", "Enter the number corresponding to a course to select it."),
+                        exit_label="Exit Course Selection")
     except FileNotFoundError:
         print(f"Error: File '{file_path}' not found.")
         return None
 
 
+def select_course_by_search(file_path, limit=5):
+    """
+    Lets the user pick a course from the best ranked search results. Returns the course
+    name with its details, as the paginated selection does, or None to go back.
+    """
+    search_term = input("Enter the course name to search: ").strip()
+    results = search_courses(search_term, file_path, limit)
+    if not results:
+        print(f"No courses found for '{search_term}'.")
+        return None
+
+    print("\nSearch Results:")
+    print("-" * 40)
+    for i, (_, course_id, course_name, _) in enumerate(results):
+        print(f"{i + 1}. {course_name} (ID: {course_id})")
+    print("-" * 40)
+
+    choice = input("Enter the number of a course to select it, or press Enter to go back: ").strip()
+    if choice.isdigit() and 0 < int(choice) <= len(results):
+        _, _, course_name, details = results[int(choice) - 1]
+        return f"{course_name},{details}" if details else course_name
+    if choice:
+        print("Invalid selection.")
+    return None
+
+
 def student_registration(file_path="registrations.txt", courses_file="courses.txt"):
     selected_course = display_paginated_courses(courses_file)
     if not selected_course:
@@ -82,7 +95,16 @@ def student_registration(file_path="registrations.txt", courses_file="courses.tx
         if not passport_number:
             raise ValueError("Passport Number cannot be empty.")
 
-        append_to_file(file_path, f"{name},{email},{passport_number},{selected_course}\n")
+        sources = registration_sources(file_path)
+        applicants = load_applicant_index(sources)
+        duplicate = find_open_application(applicants, passport_number, email)
+        if duplicate:
+            field, status = duplicate
+            state = "under review" if status == "pending" else "accepted"
+            raise ValueError(f"An application with this {field} is already {state}.")
+
+        append_to_file(file_path, f"{name},{email},{passport_number},{selected_course}")
+        record_applicants(applicants, [(passport_number, email, "pending")], sources)
 
         print("\nRegistration Successful!")
         print(f"Name: {name}\nEmail: {email}\nPassport Number: {passport_number}\nCourse: {selected_course}")
@@ -92,49 +114,122 @@ def student_registration(file_path="registrations.txt", courses_file="courses.tx
 
 
 def view_registrations(file_path="registrations.txt"):
+    def format_registration(number, record):
+        fields = [field.strip() for field in record.split(",", 3)]
+        if len(fields) >= 4:
+            # Using list indexing
+            name = fields[0]
+            email = fields[1]
+            course = fields[3]
+            return f"{number}. Name: {name:<18} Email: {email:<28} Course: {course:<18}"
+        return f"Malformed entry skipped: {record}"
+
     try:
-        file_contents = read_file(file_path)
-        if not file_contents or all(line.strip() == "" for line in file_contents):
+        if count_records(file_path) == 0:
             print(f"Error: {file_path} is empty. No registrations to display.")
             return
+        paginate(file_path, format_registration, "Current Registrations:")
+    except FileNotFoundError:
+        print("Error: No registrations file found.")
 
-        print("\nCurrent Registrations:")
-        print("-" * 50)
-        for line in file_contents:
-            fields = line.strip().split(",")
-            if len(fields) >= 4:
-                # Using list indexing
-                name = fields[0].strip()
-                email = fields[1].strip()
-                passport = fields[2].strip()
-                course = fields[3].strip()
-                print(f"Name: {name:<18} Email: {email:<28} Course: {course:<18}")
-            else:
-                print(f"Malformed entry skipped: {line.strip()}")
-        print("-" * 50)
 
-        input("Press Enter to continue...")
+def record_decision(line, decision, decisions_file=DECISIONS_FILE):
+    """
+    Appends a review decision to the decisions file and flushes it to disk, so that the
+    decisions of an interrupted review are not lost.
+    """
+    with open(decisions_file, "a", encoding="utf-8") as file:
+        file.write(f"{decision}\t{line.strip()}\n")
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def load_decisions(decisions_file=DECISIONS_FILE):
+    """Returns {registration line: 'accept' or 'decline'} from the decisions file, the last decision wins."""
+    decisions = {}
+    try:
+        with open(decisions_file, "r", encoding="utf-8") as file:
+            for entry in file:
+                fields = entry.rstrip("\n").split("\t", 1)
+                if len(fields) == 2 and fields[0] in ("accept", "decline"):
+                    decisions[fields[1]] = fields[0]
     except FileNotFoundError:
-        print("Error: No registrations file found.")
+        pass
+    return decisions
 
 
-def process_registrations(file_path="registrations.txt", courses_file="courses.txt"):
+def commit_decisions(file_path="registrations.txt", decisions_file=DECISIONS_FILE,
+                     accepted_file="accepted_registrations.txt", declined_file="declined_registrations.txt"):
+    """
+    Applies every pending review decision in one pass: decided rows are dropped from the
+    registrations with a single journal write, and added to the accepted and declined
+    files with one append each. Rows already in those files are not added again, so a
+    commit that was interrupted can simply be run again. Returns the accepted and declined counts.
+    """
+    decisions = load_decisions(decisions_file)
+    if not decisions:
+        return 0, 0
+
+    sources = registration_sources(file_path, accepted_file, declined_file)
+    applicants = load_applicant_index(sources)
+    decided_keys = {line for line in read_file(file_path) if line in decisions}
+    if decided_keys:
+        write_journal(file_path, [("D", line) for line in decided_keys])
+
+    counts = []
+    for decision, target_file in (("accept", accepted_file), ("decline", declined_file)):
+        lines = [line for line, choice in decisions.items() if choice == decision]
+        try:
+            existing = set(read_file(target_file))
+        except FileNotFoundError:
+            existing = set()
+        new_lines = [line for line in lines if line not in existing]
+        if new_lines:
+            append_to_file(target_file, new_lines)
+        counts.append(len(lines))
+
+    statuses = {"accept": "accepted", "decline": "declined"}
+    decided = []
+    for line, decision in decisions.items():
+        fields = [field.strip() for field in line.split(",", 3)]
+        if len(fields) >= 3:
+            decided.append((fields[2], fields[1], statuses[decision]))
+    record_applicants(applicants, decided, sources)
+    os.remove(decisions_file)
+    log_message(f"Registration decisions committed: {counts[0]} accepted, {counts[1]} declined.")
+    return counts[0], counts[1]
+
+
+def process_registrations(file_path="registrations.txt", courses_file="courses.txt",
+                          decisions_file=DECISIONS_FILE):
+    """
+    Reviews the pending registrations one by one. Decisions are kept in the decisions
+    file while reviewing and committed together at the end, or when the review is
+    stopped. Decisions left behind by an interrupted review are committed first.
+    """
     print("Processing registrations...")
 
     try:
-        with open(courses_file, "r") as file:
-            # Modified list comprehension to avoid tuple creation
-            courses = [[split_line[0].strip(), split_line[1].strip()]
-                      for line in file
-                      if "," in line
-                      for split_line in [line.strip().split(",", 1)]]
+        if load_decisions(decisions_file):
+            accepted, declined = commit_decisions(file_path, decisions_file)
+            print(f"Committed {accepted} accepted and {declined} declined registrations "
+                  f"from an interrupted review.")
+
+        # Map every course name (with its details) to its ID once
+        course_ids = {}
+        for course_entry in iter_records(courses_file, maxsplit=1):
+            if len(course_entry) == 2:
+                course_ids.setdefault(course_entry[1], course_entry[0])
 
         file_contents = read_file(file_path)
         if not file_contents or all(line.strip() == "" for line in file_contents):
             print(f"Error: {file_path} is empty. No registrations to process.")
             return
 
+        stopped = False
         for line in file_contents:
+            if stopped:
+                break
             fields = line.strip().split(",")
             if len(fields) < 4:
                 print(f"Malformed entry skipped: {line.strip()}")
@@ -145,24 +240,15 @@ def process_registrations(file_path="registrations.txt", courses_file="courses.t
             passport = fields[2].strip()
             course = ",".join(fields[3:]).strip()
 
-            course_id = None
-            for course_entry in courses:
-                if len(course_entry) == 2 and course_entry[1] == course:
-                    course_id = course_entry[0]
-                    break
+            course_id = course_ids.get(course)
 
             while True:
                 decision = input(
-                    f"Do you want to accept or decline this registration? (accept/decline) for {name}: "
+                    f"Do you want to accept or decline this registration? (accept/decline/stop) for {name}: "
                 ).strip().lower()
 
                 if decision in ["accept", "decline"]:
-                    file_to_write = (
-                        "accepted_registrations.txt"
-                        if decision == "accept"
-                        else "declined_registrations.txt"
-                    )
-                    append_to_file(file_to_write, line)
+                    record_decision(line, decision, decisions_file)
 
                     if decision == "accept":
                         print("\nAccepted Student Information (copy this for reference):")
@@ -179,13 +265,15 @@ def process_registrations(file_path="registrations.txt", courses_file="courses.t
                             print("Error: Could not import 'add_student'. Ensure the module exists.")
                     else:
                         print(f"Student {name} has been declined.\n")
-
-                    remaining_lines = [l for l in file_contents if l.strip() != line.strip()]
-                    with open(file_path, "w") as file:
-                        file.writelines(remaining_lines)
+                    break
+                elif decision == "stop":
+                    stopped = True
                     break
                 else:
-                    print("Invalid input. Please enter 'accept' or 'decline'.")
+                    print("Invalid input. Please enter 'accept', 'decline' or 'stop'.")
+
+        accepted, declined = commit_decisions(file_path, decisions_file)
+        print(f"Review saved: {accepted} accepted, {declined} declined.")
     except FileNotFoundError as e:
         print(f"Error: {e.filename} was not found.")
     except Exception as e:
@@ -194,10 +282,9 @@ def process_registrations(file_path="registrations.txt", courses_file="courses.t
 
 def generate_report_accepted(file_path="accepted_registrations.txt"):
     try:
-        file_contents = read_file(file_path)
+        records = iter_records(file_path)
         print("Accepted registrations: ")
-        for line in file_contents:
-            fields = line.strip().split(",")
+        for fields in records:
             if len(fields) == 4:
                 print(f"Name: {fields[0]:<18} Email: {fields[1]:<28} Department: {fields[3]:<18}")
 
@@ -208,10 +295,9 @@ def generate_report_accepted(file_path="accepted_registrations.txt"):
 
 def generate_report_declined(file_path="declined_registrations.txt"):
     try:
-        file_contents = read_file(file_path)
+        records = iter_records(file_path)
         print("Declined registrations: ")
-        for line in file_contents:
-            fields = line.strip().split(",")
+        for fields in records:
             if len(fields) == 4:
                 print(f"Name: {fields[0]:<18} Email: {fields[1]:<28} Department: {fields[3]:<18}")
 
@@ -227,24 +313,17 @@ def check_student_acceptance(accepted_file="accepted_registrations.txt", decline
         return
 
     try:
-        with open(accepted_file, "r", encoding="utf-8") as file:
-            for line in file:
-                fields = line.strip().split(",")
-                if len(fields) >= 3 and fields[2] == passport_number:
-                    print("The student has been accepted.")
-                    return
-
-        with open(declined_file, "r", encoding="utf-8") as file:
-            for line in file:
-                fields = line.strip().split(",")
-                if len(fields) >= 3 and fields[2] == passport_number:
-                    print("The student has been declined.")
-                    return
-
-        print("The student is not found in the records.")
+        status = applicant_status(passport_number, registration_sources(accepted_file=accepted_file,
+                                                                        declined_file=declined_file))
+        if status == "accepted":
+            print("The student has been accepted.")
+        elif status == "declined":
+            print("The student has been declined.")
+        elif status == "pending":
+            print("The application is still under review.")
+        else:
+            print("The student is not found in the records.")
 
-    except FileNotFoundError as e:
-        print(f"Error: File '{e.filename}' not found.")
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
 
@@ -0,0 +1,129 @@
+from datetime import date, datetime
+
+# Converters for the columns that absorb a variable number of fields. A REST_TEXT column
+# joins its fields back together with commas, a REST_LIST column keeps them as a tuple.
+# An OPTIONAL_TEXT column is a REST_TEXT column that may be missing, and is then empty.
+REST_TEXT = "rest_text"
+REST_LIST = "rest_list"
+OPTIONAL_TEXT = "optional_text"
+
+
+def parse_date(value):
+    """Parses a YYYY-MM-DD date."""
+    return date.fromisoformat(value)
+
+
+def parse_datetime(value):
+    """Parses a YYYY-MM-DD HH:MM:SS timestamp."""
+    return datetime.fromisoformat(value)
+
+
+# Column names and converters of every data file the system keeps, in the order in
+# which main.py creates them. Rows are parsed into plain tuples in this column order.
+SCHEMAS = {
+    "tuition_fees_pending.txt": (
+        ("student_id", str), ("amount", float), ("updated_at", parse_datetime)),
+    "tuition_fees_paid.txt": (
+        ("student_id", str), ("amount", float), ("paid_at", parse_datetime), ("status", str)),
+    "fee_receipts.txt": (
+        ("student_id", str), ("amount", float), ("paid_at", parse_datetime)),
+    "modules_list.txt": (
+        ("module_id", str), ("module_name", str), ("lecturer_name", str), ("lecturer_id", str),
+        ("credits", int), ("classes", int)),
+    "courses.txt": (
+        ("course_code", str), ("course_name", str), ("details", OPTIONAL_TEXT)),
+    "student_records.txt": (
+        ("name", str), ("student_id", str), ("course", str), ("modules", REST_LIST),
+        ("intake_month", str), ("registration_month", str), ("phone_number", str),
+        ("email", str), ("address", str), ("age", str)),
+    "module_student_records.txt": (
+        ("module_id", str), ("student_id", str), ("student_name", str)),
+    "attendance_records.txt": (
+        ("module_id", str), ("student_id", str), ("date", parse_date), ("status", str)),
+    "grades_records.txt": (
+        ("student_id", str), ("module_id", str), ("percentage", float), ("distinction", str)),
+    "registrations.txt": (
+        ("name", str), ("email", str), ("passport_number", str), ("course", REST_TEXT)),
+    "accepted_registrations.txt": (
+        ("name", str), ("email", str), ("passport_number", str), ("course", REST_TEXT)),
+    "declined_registrations.txt": (
+        ("name", str), ("email", str), ("passport_number", str), ("course", REST_TEXT)),
+}
+
+# file name -> {column name: position in the parsed row}
+COLUMN_INDEXES = {
+    file_name: {name: position for position, (name, _) in enumerate(columns)}
+    for file_name, columns in SCHEMAS.items()
+}
+
+
+def table_name(file_path):
+    """Returns the file name part of a path, which is how tables are registered."""
+    return file_path.replace("\\", "/").rsplit("/", 1)[-1]
+
+
+def get_schema(file_path):
+    """Returns the column specification of a data file, or None if it is not registered."""
+    return SCHEMAS.get(table_name(file_path))
+
+
+def column_index(file_path, column):
+    """Returns the position of a named column in the parsed rows of a data file."""
+    return COLUMN_INDEXES[table_name(file_path)][column]
+
+
+def get_parser(file_path):
+    """
+    Returns a function that turns a stripped line of the given data file into a tuple of
+    typed values, splitting it only once. The function returns None for lines that are
+    too short or hold a value that does not convert. Fields beyond the last column are
+    ignored unless the schema has a rest column to take them.
+    """
+    schema = get_schema(file_path)
+    if schema is None:
+        raise ValueError(f"No schema registered for '{file_path}'.")
+    converters = [converter for _, converter in schema]
+    rest_position = next((position for position, converter in enumerate(converters)
+                          if converter in (REST_TEXT, REST_LIST, OPTIONAL_TEXT)), None)
+    column_count = len(converters)
+    # Text columns are already strings after the split, so only the others are converted
+    typed_columns = [(position, converter) for position, converter in enumerate(converters)
+                     if converter is not str and position != rest_position]
+
+    if rest_position is None:
+        def parse(line):
+            fields = [field.strip() for field in line.split(",")]
+            if len(fields) < column_count:
+                return None
+            del fields[column_count:]
+            try:
+                for position, converter in typed_columns:
+                    fields[position] = converter(fields[position])
+            except ValueError:
+                return None
+            return tuple(fields)
+        return parse
+
+    rest_text = converters[rest_position] is not REST_LIST
+    # A text column needs at least one field, an optional text or list column may be empty
+    minimum_width = 1 if converters[rest_position] is REST_TEXT else 0
+
+    def parse(line):
+        fields = [field.strip() for field in line.split(",")]
+        rest_width = len(fields) - column_count + 1
+        if rest_width < minimum_width:
+            return None
+        rest_end = rest_position + rest_width
+        rest = fields[rest_position:rest_end]
+        fields[rest_position:rest_end] = [",".join(rest) if rest_text else tuple(rest)]
+        try:
+            for position, converter in typed_columns:
+                fields[position] = converter(fields[position])
+        except ValueError:
+            return None
+        return tuple(fields)
+    return parse
+
+
+if __name__ == "__main__":
+    print("Schema Module loaded.")
@@ -0,0 +1,246 @@
+import heapq
+import json
+import os
+from collections import Counter
+
+from utils.filehandling import load_table, table_signature, cache_get, cache_put, log_message
+
+# Exact substring matches on the course name score at least this much, fuzzy matches less
+EXACT_MATCH_SCORE = 1.0
+# Fuzzy matches below this trigram similarity are not worth suggesting
+MIN_SIMILARITY = 0.3
+# Details are long, so a hit there counts for less than the same hit in the name
+DETAILS_WEIGHT = 0.5
+
+
+def search_index_path(file_path):
+    """Returns the path of the search index kept next to a courses file."""
+    return file_path + ".search"
+
+
+def normalize_words(text):
+    """Lower-cases a text and splits it into words, treating punctuation as a separator."""
+    return "".join(char if char.isalnum() else " " for char in text.lower()).split()
+
+
+def trigrams(text):
+    """Returns the set of three-character sequences of a text, with words padded by spaces."""
+    padded = f" {' '.join(normalize_words(text))} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(first, second, max_distance=None):
+    """
+    Returns the Levenshtein distance between two words. With max_distance the work
+    stops early and max_distance + 1 is returned once the words are known to be further apart.
+    """
+    if len(first) < len(second):
+        first, second = second, first
+    if max_distance is not None and len(first) - len(second) > max_distance:
+        return max_distance + 1
+    previous = list(range(len(second) + 1))
+    for i, first_char in enumerate(first, 1):
+        current = [i]
+        for j, second_char in enumerate(second, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (first_char != second_char)))
+        if max_distance is not None and min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+def bk_tree_add(tree, word):
+    """
+    Adds a word to a BK-tree. A node is a [word, children] pair, where children maps the
+    edit distance to the child node, as a string so that the tree survives JSON.
+    """
+    if tree is None:
+        return [word, {}]
+    node = tree
+    while True:
+        distance = edit_distance(word, node[0])
+        if distance == 0:
+            return tree
+        child = node[1].get(str(distance))
+        if child is None:
+            node[1][str(distance)] = [word, {}]
+            return tree
+        node = child
+
+
+def bk_tree_search(tree, word, max_distance):
+    """Returns (distance, word) pairs for every word in a BK-tree within max_distance of a word."""
+    found = []
+    stack = [tree] if tree else []
+    while stack:
+        node_word, children = stack.pop()
+        distance = edit_distance(word, node_word)
+        if distance <= max_distance:
+            found.append((distance, node_word))
+        # Only subtrees at a distance within max_distance of this one can hold a match
+        for edge, child in children.items():
+            if distance - max_distance <= int(edge) <= distance + max_distance:
+                stack.append(child)
+    return found
+
+
+def build_course_index(file_path="courses.txt"):
+    """
+    Builds the search index of a courses file: trigram postings over course names and
+    over course details, word postings over course names and a BK-tree of the name
+    words for typo correction.
+    """
+    courses = load_table(file_path)
+    name_trigrams = {}
+    detail_trigrams = {}
+    word_postings = {}
+    name_sizes = []
+    search_names = []
+    for entry_id, (_, course_name, details) in enumerate(courses):
+        search_names.append(" ".join(normalize_words(course_name)))
+        name_grams = trigrams(course_name)
+        name_sizes.append(len(name_grams))
+        for gram in name_grams:
+            name_trigrams.setdefault(gram, []).append(entry_id)
+        for gram in trigrams(details):
+            detail_trigrams.setdefault(gram, []).append(entry_id)
+        for word in set(normalize_words(course_name)):
+            word_postings.setdefault(word, []).append(entry_id)
+
+    bk_tree = None
+    for word in word_postings:
+        # Numbers and codes in course names are not misspelt words
+        if word.isalpha():
+            bk_tree = bk_tree_add(bk_tree, word)
+
+    return {
+        "courses": [list(course) for course in courses],
+        "search_names": search_names,
+        "name_sizes": name_sizes,
+        "name_trigrams": name_trigrams,
+        "detail_trigrams": detail_trigrams,
+        "words": word_postings,
+        "bk_tree": bk_tree,
+    }
+
+
+def save_course_index(file_path, signature, index):
+    """Writes a search index next to its courses file, tagged with the signature it was built for."""
+    index_file = search_index_path(file_path)
+    temp_path = index_file + ".tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump({"signature": signature, "index": index}, file, separators=(",", ":"))
+        os.replace(temp_path, index_file)
+    except OSError as e:
+        log_message(f"Could not save the search index of '{file_path}': {e}")
+
+
+def load_saved_course_index(file_path, signature):
+    """Returns the saved search index of a courses file if it is still current, otherwise None."""
+    try:
+        with open(search_index_path(file_path), "r", encoding="utf-8") as file:
+            saved = json.load(file)
+    except (OSError, ValueError):
+        return None
+    # JSON turns the signature tuples into lists, so compare it in the same form
+    if saved.get("signature") != json.loads(json.dumps(signature)):
+        return None
+    return saved.get("index")
+
+
+def get_course_index(file_path="courses.txt"):
+    """
+    Returns the search index of a courses file. The index is kept in memory and in a
+    file next to the courses, and is only rebuilt once the courses change.
+    """
+    signature = table_signature(file_path)
+    index = cache_get(("search", file_path), signature)
+    if index is None:
+        index = load_saved_course_index(file_path, signature)
+        if index is None:
+            index = build_course_index(file_path)
+            save_course_index(file_path, signature, index)
+            log_message(f"Search index of '{file_path}' rebuilt for {len(index['courses'])} courses.")
+        cache_put(("search", file_path), file_path, signature, index)
+    return index
+
+
+def typo_candidates(index, search_term):
+    """
+    Scores courses whose name words are within a small edit distance of the words of
+    the search term. Used when trigram similarity finds nothing, e.g. for short words
+    with a typo that share no trigram with the intended word.
+    """
+    scores = Counter()
+    query_words = normalize_words(search_term)
+    for query_word in query_words:
+        max_distance = 1 if len(query_word) <= 4 else 2
+        best = {}
+        for distance, word in bk_tree_search(index["bk_tree"], query_word, max_distance):
+            for entry_id in index["words"][word]:
+                best[entry_id] = min(best.get(entry_id, distance), distance)
+        for entry_id, distance in best.items():
+            # Each matched word adds up to one point, less for every edit it needed
+            scores[entry_id] += (1 - distance / (max_distance + 1)) / len(query_words)
+    return scores
+
+
+def search_courses(search_term, file_path="courses.txt", limit=10):
+    """
+    Returns up to limit courses for a search term as (score, course_code, course_name,
+    details) tuples, best first. Courses whose name contains the term score at least
+    EXACT_MATCH_SCORE, the rest are ranked by trigram similarity to the name and details,
+    falling back to edit distance on name words when no trigram match is close enough.
+    """
+    term = " ".join(normalize_words(search_term))
+    if not term:
+        return []
+    index = get_course_index(file_path)
+    courses = index["courses"]
+    query_grams = trigrams(term)
+
+    name_hits = Counter()
+    detail_hits = Counter()
+    for gram in query_grams:
+        name_hits.update(index["name_trigrams"].get(gram, ()))
+        detail_hits.update(index["detail_trigrams"].get(gram, ()))
+
+    # Courses sharing fewer trigrams than this cannot reach MIN_SIMILARITY, so they are
+    # skipped before any scoring. A name containing the term shares every trigram but
+    # the two at its ends, which is never below this bound.
+    query_size = len(query_grams)
+    min_shared = MIN_SIMILARITY * query_size
+    name_sizes = index["name_sizes"]
+    search_names = index["search_names"]
+    scores = {}
+    for entry_id, shared in name_hits.items():
+        if shared >= min_shared:
+            # Average how much of the term the name covers with how alike the two are
+            # overall, so that a long name is not ruled out but a close one ranks higher
+            jaccard = shared / (query_size + name_sizes[entry_id] - shared)
+            scores[entry_id] = (shared / query_size + jaccard) / 2
+    for entry_id, shared in detail_hits.items():
+        if shared >= min_shared / DETAILS_WEIGHT:
+            scores[entry_id] = max(scores.get(entry_id, 0), DETAILS_WEIGHT * shared / query_size)
+
+    if len(term) < 3:
+        # Too short to share a whole trigram with the middle of a word, so scan the names
+        candidates = range(len(courses))
+    else:
+        candidates = list(scores)
+    for entry_id in candidates:
+        if term in search_names[entry_id]:
+            scores[entry_id] = EXACT_MATCH_SCORE + scores.get(entry_id, 0)
+
+    scores = {entry_id: score for entry_id, score in scores.items() if score >= MIN_SIMILARITY}
+    if not scores:
+        scores = typo_candidates(index, term)
+
+    best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+    return [(score, *courses[entry_id]) for entry_id, score in best]
+
+
+if __name__ == "__main__":
+    print("Search Module loaded.")
@@ -0,0 +1,110 @@
+from utils.aggregate import aggregate, column_total
+from utils.filehandling import (read_file, overwrite_file, write_journal, file_signature, table_signature,
+                                cache_get, cache_put, update_cached, log_message)
+
+# Sidecar file holding name,value for every dashboard counter
+STATS_FILE = "university_stats.txt"
+
+# Every counter with the data file it is kept for and the column it sums, or None to
+# count the rows of the file.
+STAT_SOURCES = {
+    "students": ("student_records.txt", None),
+    "courses": ("courses.txt", None),
+    "modules": ("modules_list.txt", None),
+    "enrollments": ("module_student_records.txt", None),
+    "pending_fees": ("tuition_fees_pending.txt", "amount"),
+    "paid_fees": ("tuition_fees_paid.txt", "amount"),
+}
+
+
+def count_stat(name):
+    """Counts or sums the data file of a counter from scratch."""
+    file_path, column = STAT_SOURCES[name]
+    try:
+        if column:
+            # Amounts count whether or not the rest of their row parses
+            return round(column_total(file_path, column), 2)
+        totals = aggregate(file_path).get(())
+    except FileNotFoundError:
+        return 0.0 if column else 0
+    return totals["count"] if totals else 0
+
+
+def write_stats(stats, updates, stats_file=STATS_FILE):
+    """Records {name: new value} of some counters in the journal of the stats file and in the cached counters."""
+    update_cached(("stats", stats_file), stats_file, stats,
+                  lambda: write_journal(stats_file, [("U", f"{name},{value}") for name, value in updates.items()]),
+                  lambda cached: cached.update(updates))
+
+
+def rebuild_stats(stats_file=STATS_FILE):
+    """Recounts every counter from the data files and rewrites the stats file."""
+    stats = {name: count_stat(name) for name in STAT_SOURCES}
+    update_cached(("stats", stats_file), stats_file, stats,
+                  lambda: overwrite_file(stats_file, [f"{name},{value}\n" for name, value in stats.items()]))
+    log_message(f"Dashboard counters rebuilt: {stats}")
+    return stats
+
+
+def load_stats(stats_file=STATS_FILE):
+    """
+    Returns the dashboard counters as {name: value}. They are read once per change of
+    the stats file, and counted from the data files if the stats file does not exist yet.
+    """
+    if file_signature(stats_file) is None:
+        return rebuild_stats(stats_file)
+    signature = table_signature(stats_file)
+    stats = cache_get(("stats", stats_file), signature)
+    if stats is None:
+        stats = {}
+        for record in read_file(stats_file):
+            fields = record.split(",")
+            if len(fields) == 2 and fields[0] in STAT_SOURCES:
+                stats[fields[0]] = float(fields[1]) if STAT_SOURCES[fields[0]][1] else int(fields[1])
+        cache_put(("stats", stats_file), stats_file, signature, stats)
+        missing = {name: count_stat(name) for name in STAT_SOURCES if name not in stats}
+        if missing:
+            write_stats(stats, missing, stats_file)
+    return stats
+
+
+def record_change(file_path, rows=0, amount=0.0, stats_file=STATS_FILE):
+    """
+    Updates the counters kept for a data file after rows were added (positive) or
+    removed (negative), or after amounts were added to or taken from a summed column.
+    Files that have no counter, such as test copies, are ignored.
+    """
+    names = [name for name, (source, _) in STAT_SOURCES.items() if source == file_path]
+    if not names:
+        return
+    if file_signature(stats_file) is None:
+        # Counting from scratch already includes the change
+        rebuild_stats(stats_file)
+        return
+    stats = load_stats(stats_file)
+    updates = {name: round(stats[name] + amount, 2) if STAT_SOURCES[name][1] else stats[name] + rows
+               for name in names}
+    write_stats(stats, updates, stats_file)
+
+
+def refresh_stats(file_paths, stats_file=STATS_FILE):
+    """Recounts the counters kept for the given data files, after a bulk change to them."""
+    names = [name for name, (source, _) in STAT_SOURCES.items() if source in file_paths]
+    if not names:
+        return
+    write_stats(load_stats(stats_file), {name: count_stat(name) for name in names}, stats_file)
+
+
+def verify_stats(stats_file=STATS_FILE):
+    """Recounts every counter and returns {name: (stored value, actual value)} for those that differ."""
+    stats = load_stats(stats_file)
+    mismatches = {}
+    for name in STAT_SOURCES:
+        actual = count_stat(name)
+        if stats[name] != actual:
+            mismatches[name] = (stats[name], actual)
+    return mismatches
+
+
+if __name__ == "__main__":
+    print("Stats Module loaded.")
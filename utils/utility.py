@@ -1,17 +1,21 @@
-from utils.filehandling import read_file, log_message
+from utils.filehandling import log_message, lookup_record, load_table
+from utils.search import search_courses, EXACT_MATCH_SCORE
+from utils.enrollment import load_enrollment_index
+
+# Most matching courses search_course lists for one search
+SEARCH_RESULT_LIMIT = 20
 
 
 def search_course(file_path="courses.txt"):
     """
         Searches for a course by name in a file and displays matching results or suggestions.
 
-        The function reads course information from the courses file, searches for matches based
-        on a user-provided search term, and displays the results. If no matches are found, it
-        provides up to three suggestions based on partial matches or similar course names.
+        The search goes through the trigram index of utils.search, which ranks the courses
+        whose name contains the search term first. If no course contains the term, up to
+        three suggestions are shown, ranked by similarity so that typos still find a course.
     """
     try:
-        courses = read_file(file_path)
-        if not courses:
+        if not load_table(file_path):
             print(f"No courses available in the file '{file_path}'.")
             input("Press Enter to continue...")
             return
@@ -23,35 +27,25 @@ def search_course(file_path="courses.txt"):
 
     search_term = input("Enter the course name to search: ").strip().lower()
 
-    results = []
-    for course in courses:
-        parts = course.split(",")
-        if len(parts) > 1 and search_term in parts[1].strip().lower():
-            """
-            Checks if the course has more than one part and whether
-            the search term is in the second part (case-insensitive).
-            """
-            results.append(course.strip())
+    ranked = search_courses(search_term, file_path, limit=SEARCH_RESULT_LIMIT)
+    results = [course for course in ranked if course[0] >= EXACT_MATCH_SCORE]
 
     if results:
-        print(f"Matching courses found ({len(results)}):")
-        for course in results:
-            print(course)
+        if len(results) < SEARCH_RESULT_LIMIT:
+            print(f"Matching courses found ({len(results)}):")
+        else:
+            # The search stops at the limit, so there may be more matches than shown
+            print(f"Top {len(results)} matches:")
+        for _, course_code, course_name, details in results:
+            print(",".join(part for part in (course_code, course_name, details) if part))
             input("Press Enter to continue...")
     else:
-        """
-        Extracts course names from courses and adds them to suggestions if they
-        match the search term or start with its first two characters.
-        """
-        course_names = [course.split(",")[1].strip() for course in courses if len(course.split(",")) > 1]
-        suggestions = []
-        for course_name in course_names:
-            if search_term in course_name.lower() or course_name.lower().startswith(search_term[:2]):
-                suggestions.append(course_name)
+        # Nothing contains the term, so the ranked results are close matches
+        suggestions = [course_name for _, _, course_name, _ in ranked[:3]]
 
         if suggestions:
             print(f"Sorry, no exact matches were found for '{search_term}'. Did you mean:")
-            for suggestion in suggestions[:3]:
+            for suggestion in suggestions:
                 # Displays up to 3 suggestions if available,
                 print(f" - {suggestion}")
                 input("Press Enter to continue...")
@@ -67,17 +61,12 @@ def search_student_in_module(module_records_file="module_student_records.txt",
         # Searches for a specific student in a specific module by verifying the module ID, student ID,
         module_id = input("Enter the module ID: ").strip()
         try:
-            modules = read_file(modules_file)
+            module = lookup_record(modules_file, module_id)
         except FileNotFoundError:
             print(f"Error: '{modules_file}' not found.")
             input("Press Enter to continue...")
             return
-        valid_module = None
-        for module in modules:
-            fields = module.split(",")
-            if fields[0].strip() == module_id:
-                valid_module = fields[1].strip()
-                break
+        valid_module = module[1] if module and len(module) > 1 else None
         if not valid_module:
             print(f"Module ID {module_id} not found.")
             input("Press Enter to continue...")
@@ -86,32 +75,29 @@ def search_student_in_module(module_records_file="module_student_records.txt",
 
         student_id = input("Enter the student ID: ").strip()
         try:
-            students = read_file(student_records_file)
+            valid_student = student_exists(student_id, student_records_file)
         except FileNotFoundError:
             print(f"Error: '{student_records_file}' not found.")
             input("Press Enter to continue...")
             return
 
-        valid_student = any(student.split(",")[1].strip() == student_id for student in students)
         if not valid_student:
             print(f"Student ID {student_id} not found.")
             input("Press Enter to continue...")
             return
 
         try:
-            # and matching records in the module records file. Handles file reading and provides appropriate feedback on results.
-            records = read_file(module_records_file)
+            # and the exact (module ID, student ID) pair in the enrollment index. Provides appropriate feedback on results.
+            enrolled_students = load_enrollment_index(module_records_file)["modules"].get(module_id, {})
         except FileNotFoundError:
             print(f"Error: '{module_records_file}' not found.")
             input("Press Enter to continue...")
             return
 
-        matches = [record for record in records if record.startswith(f"{module_id},") and student_id in record]
-        if matches:
+        if student_id in enrolled_students:
             print(f"Student ID {student_id} is enrolled in module {module_id}:")
-            for match in matches:
-                print(match.strip())
-                input("Press Enter to continue...")
+            print(f"{module_id},{student_id},{enrolled_students[student_id]}")
+            input("Press Enter to continue...")
         else:
             print(f"Student ID {student_id} not found in module {module_id}.")
             input("Press Enter to continue...")
@@ -120,6 +106,11 @@ def search_student_in_module(module_records_file="module_student_records.txt",
         print(f"An unexpected error occurred: {e}")
 
 
+def student_exists(student_id, student_records_file="student_records.txt"):
+    """Checks if a student ID is in the primary key index of the student records."""
+    return lookup_record(student_records_file, student_id, key_column=1) is not None
+
+
 def get_valid_student_id(student_records_file="student_records.txt"):
     while True:
         student_id = input("Enter the student ID: ").strip()
@@ -131,14 +122,9 @@ def get_valid_student_id(student_records_file="student_records.txt"):
             print("Student ID must be alphanumeric. Please try again.")
         else:
             try:
-                with open(student_records_file, "r") as file:
-                    for line in file:
-                        line = line.strip()
-                        if line:
-                            record = line.split(",")
-                            # and checks if it exists in the student records file.
-                            if len(record) > 1 and record[1].strip() == student_id:
-                                return student_id
+                # Checks the ID against the primary key index, which is read once per change of the file.
+                if student_exists(student_id, student_records_file):
+                    return student_id
                 print("Student ID not found in the student records. Please try again.")
             except FileNotFoundError:
                 print(f"Error: The file '{student_records_file}' does not exist.")